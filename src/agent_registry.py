@@ -0,0 +1,94 @@
+import asyncio
+import os
+import threading
+import time
+from typing import Any, Dict, List, Tuple
+
+# Executors to build at startup, e.g. "team:weighted,fixture:weighted"
+AGENT_WARMUP = os.getenv("AGENT_WARMUP", "")
+
+ENTITY_TYPES = ["team", "fixture"]
+SCORING_METHODS = ["weighted", "binary", "weighted-native"]
+
+AgentKey = Tuple[str, str]
+
+
+def parse_warmup(value: str) -> List[AgentKey]:
+    """Parses `entity_type:scoring_method` pairs; a bare entity type means weighted."""
+    keys = []
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        entity_type, _, scoring_method = item.strip().partition(":")
+        keys.append((entity_type.lower(), scoring_method or "weighted"))
+    return keys
+
+
+# --- Lazy Executor Registry ---
+class AgentRegistry:
+    """
+    Builds one executor per (entity_type, scoring_method) the first time it is
+    requested and reuses it afterwards. LangChain, the tools and the Bedrock
+    client are only imported when the first executor is built, so a server can
+    open its port before paying for them.
+    """
+
+    def __init__(self, fixture_index_path: str = None):
+        self.fixture_index_path = fixture_index_path
+        self._executors: Dict[AgentKey, Any] = {}
+        self._build_seconds: Dict[AgentKey, float] = {}
+        self._lock = threading.Lock()
+
+    def get(self, entity_type: str, scoring_method: str = "weighted"):
+        """Returns the cached executor, building it first if needed."""
+        key = (entity_type.lower(), scoring_method)
+        executor = self._executors.get(key)
+        if executor is not None:
+            return executor
+
+        if key[0] not in ENTITY_TYPES or key[1] not in SCORING_METHODS:
+            raise ValueError(
+                f"Unsupported entity type / scoring method: {key[0]} / {key[1]}"
+            )
+
+        with self._lock:
+            if key not in self._executors:
+                from er_agent import build_agent
+
+                started = time.perf_counter()
+                executor = build_agent(*key, self.fixture_index_path)
+                if executor is None:
+                    raise ValueError(
+                        f"Unsupported entity type / scoring method: {key[0]} / {key[1]}"
+                    )
+                self._build_seconds[key] = time.perf_counter() - started
+                self._executors[key] = executor
+                print(
+                    f"Built {key[0]}/{key[1]} agent in {self._build_seconds[key]:.2f}s."
+                )
+        return self._executors[key]
+
+    async def aget(self, entity_type: str, scoring_method: str = "weighted"):
+        """Like `get`, but builds off the event loop."""
+        executor = self._executors.get((entity_type.lower(), scoring_method))
+        if executor is not None:
+            return executor
+        return await asyncio.to_thread(self.get, entity_type, scoring_method)
+
+    def warm(self, keys: List[AgentKey]):
+        for entity_type, scoring_method in keys:
+            try:
+                self.get(entity_type, scoring_method)
+            except Exception as e:
+                print(f"Warm-up of {entity_type}/{scoring_method} failed: {e}")
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "entity_type": entity_type,
+                "scoring_method": scoring_method,
+                "build_s": round(self._build_seconds[(entity_type, scoring_method)], 3),
+                "prompt_tokens": executor.prompt_usage.stats(),
+            }
+            for (entity_type, scoring_method), executor in self._executors.items()
+        ]
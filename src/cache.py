@@ -0,0 +1,309 @@
+import asyncio
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+# Entity Cache Settings
+ENTITY_CACHE_PATH = os.getenv("ENTITY_CACHE_PATH", ".cache/entities.sqlite3")
+ENTITY_CACHE_SIZE = int(os.getenv("ENTITY_CACHE_SIZE", "10000"))
+ENTITY_CACHE_TTL = float(os.getenv("ENTITY_CACHE_TTL", str(7 * 24 * 3600)))
+
+# Search Term Cache Settings
+SEARCH_CACHE_SIZE = int(os.getenv("SEARCH_CACHE_SIZE", "5000"))
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", str(24 * 3600)))
+
+CACHE_MODES = ["use", "bypass", "warm", "invalidate"]
+
+# Club designators that do not change which team a search should find
+CLUB_AFFIXES = {"fc", "afc", "cf", "sc", "ac", "fk", "sk", "club", "football"}
+
+
+# --- In-Memory LRU with TTL ---
+class LRUTTLCache:
+    """Bounded, thread-safe in-memory LRU cache whose entries expire after a TTL."""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.enabled = True
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, expires_at: Optional[float] = None):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[key] = (value, expires_at or time.time() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Optional[Hashable] = None):
+        """Drops one key, or every entry when no key is given."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def invalidate_matching(self, predicate: Callable[[Hashable], bool]):
+        """Drops every entry whose key satisfies `predicate`."""
+        with self._lock:
+            for key in [key for key in self._entries if predicate(key)]:
+                del self._entries[key]
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+# --- Two-Tier Entity Cache ---
+class EntityCache:
+    """
+    Caches GSL entity payloads keyed by (entity_type, GSL ID): an in-process LRU
+    in front of a persistent SQLite store, so repeat lookups skip the network
+    both within a run and across runs.
+    """
+
+    def __init__(self, path: str, max_size: int, ttl_seconds: float):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.memory = LRUTTLCache(max_size, ttl_seconds)
+        self.enabled = True
+        self.disk_hits = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS entities (
+                    entity_type TEXT NOT NULL,
+                    gsl_id TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    PRIMARY KEY (entity_type, gsl_id)
+                )
+                """
+            )
+        return self._conn
+
+    def get_many(self, entity_type: str, gsl_ids: List[str]) -> Dict[str, Any]:
+        """Returns the fresh cached payloads among `gsl_ids`, keyed by GSL ID."""
+        if not self.enabled or not gsl_ids:
+            return {}
+
+        found: Dict[str, Any] = {}
+        disk_lookups = []
+        for gsl_id in gsl_ids:
+            payload = self.memory.get((entity_type, gsl_id))
+            if payload is not None:
+                found[gsl_id] = payload
+            else:
+                disk_lookups.append(gsl_id)
+
+        if disk_lookups:
+            placeholders = ",".join("?" for _ in disk_lookups)
+            with self._lock:
+                rows = (
+                    self._db()
+                    .execute(
+                        f"SELECT gsl_id, payload, expires_at FROM entities "
+                        f"WHERE entity_type = ? AND expires_at > ? AND gsl_id IN ({placeholders})",
+                        [entity_type, time.time(), *disk_lookups],
+                    )
+                    .fetchall()
+                )
+            for gsl_id, payload, expires_at in rows:
+                found[gsl_id] = json.loads(payload)
+                self.memory.set((entity_type, gsl_id), found[gsl_id], expires_at)
+                self.disk_hits += 1
+
+        return found
+
+    def get(self, entity_type: str, gsl_id: str) -> Optional[Any]:
+        return self.get_many(entity_type, [gsl_id]).get(gsl_id)
+
+    def put_many(self, entity_type: str, payloads: Dict[str, Any]):
+        """Stores payloads in both tiers; error payloads are never cached."""
+        payloads = {
+            gsl_id: payload
+            for gsl_id, payload in payloads.items()
+            if isinstance(payload, dict) and "error" not in payload
+        }
+        if not self.enabled or not payloads:
+            return
+
+        expires_at = time.time() + self.ttl_seconds
+        for gsl_id, payload in payloads.items():
+            self.memory.set((entity_type, gsl_id), payload, expires_at)
+        with self._lock:
+            conn = self._db()
+            conn.executemany(
+                "INSERT OR REPLACE INTO entities VALUES (?, ?, ?, ?)",
+                [
+                    (entity_type, gsl_id, json.dumps(payload), expires_at)
+                    for gsl_id, payload in payloads.items()
+                ],
+            )
+            conn.commit()
+
+    def put(self, entity_type: str, gsl_id: str, payload: Any):
+        self.put_many(entity_type, {gsl_id: payload})
+
+    def invalidate(self, entity_type: Optional[str] = None):
+        """Drops every cached entity, or only those of one entity type."""
+        if entity_type:
+            self.memory.invalidate_matching(lambda key: key[0] == entity_type)
+        else:
+            self.memory.invalidate()
+        with self._lock:
+            conn = self._db()
+            if entity_type:
+                conn.execute(
+                    "DELETE FROM entities WHERE entity_type = ?", (entity_type,)
+                )
+            else:
+                conn.execute("DELETE FROM entities")
+            conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self.memory.stats()
+        # A memory miss that is found on disk is still a cache hit overall
+        stats["disk_hits"] = self.disk_hits
+        stats["network_fetches"] = stats["misses"] - self.disk_hits
+        return stats
+
+
+entity_cache = EntityCache(ENTITY_CACHE_PATH, ENTITY_CACHE_SIZE, ENTITY_CACHE_TTL)
+
+
+# --- Search Term Cache ---
+def normalize_search_term(search_term: str) -> str:
+    """
+    Normalizes a search term so trivial variants share a cache entry: case,
+    punctuation, whitespace and club designators ("FC Foo", "foo fc ") are ignored.
+    """
+    term = re.sub(r"[.'’]", "", search_term.lower())
+    tokens = re.sub(r"[^\w\s]", " ", term).split()
+    significant = [token for token in tokens if token not in CLUB_AFFIXES]
+    return " ".join(significant or tokens)
+
+
+# Candidate lists keyed by (entity_type, normalized search term)
+search_cache = LRUTTLCache(SEARCH_CACHE_SIZE, SEARCH_CACHE_TTL)
+
+
+# --- Single-Flight Result Cache ---
+class CoalescingCache:
+    """
+    TTL result cache in front of an async loader. Concurrent misses for the
+    same key share one in-flight load instead of each starting their own, and
+    the load keeps running if the request that started it goes away.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.results = LRUTTLCache(max_size, ttl_seconds)
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        self.loads = 0
+        self.coalesced = 0
+
+    def _finish(
+        self, key: Hashable, task: asyncio.Task, cacheable: Callable[[Any], bool]
+    ):
+        # A load that was invalidated while running is no longer the key's
+        current = self._in_flight.get(key) is task
+        if current:
+            del self._in_flight[key]
+        # Reading the exception also marks it retrieved if nobody awaited it
+        if task.cancelled() or task.exception() is not None:
+            return
+        if current and cacheable(task.result()):
+            self.results.set(key, (task.result(), time.time()))
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        cacheable: Callable[[Any], bool] = lambda value: value is not None,
+    ) -> Tuple[Any, str, float]:
+        """
+        Returns (value, status, age_seconds), where status is HIT, MISS (this
+        call started the load) or COALESCED (it joined a load in flight).
+        """
+        cached = self.results.get(key)
+        if cached is not None:
+            value, cached_at = cached
+            return value, "HIT", time.time() - cached_at
+
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.create_task(loader())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done, cacheable))
+            self.loads += 1
+            status = "MISS"
+        else:
+            self.coalesced += 1
+            status = "COALESCED"
+        return await asyncio.shield(task), status, 0.0
+
+    def invalidate(self, key: Optional[Hashable] = None):
+        """
+        Drops cached results, and detaches loads in flight so their results
+        are not cached and later requests start a fresh load.
+        """
+        self.results.invalidate(key)
+        if key is None:
+            self._in_flight.clear()
+        else:
+            self._in_flight.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.results.stats(),
+            "loads": self.loads,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._in_flight),
+        }
@@ -1,8 +1,13 @@
 import os
 import csv
-from typing import List
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 import psycopg2
 from psycopg2 import sql
+from psycopg2.pool import ThreadedConnectionPool
+
+from sharding import Shard, in_shard
 
 # DB Credentials
 DB_HOST = os.getenv("DB_HOST")
@@ -11,80 +16,292 @@ DB_USER = os.getenv("DB_USER")
 DB_PASS = os.getenv("DB_PASS")
 DB_PORT = os.getenv("DB_PORT", "5432")
 
+# Rows fetched per round trip (keyset page or server-side cursor batch)
+POSTGRES_ITERSIZE = int(os.getenv("POSTGRES_ITERSIZE", "2000"))
+POSTGRES_POOL_SIZE = int(os.getenv("POSTGRES_POOL_SIZE", "4"))
+
+# Retrieval modes: keyset-paginated id order, or a TABLESAMPLE method
+POSTGRES_MODES = ["sequential", "system", "bernoulli"]
+
 # Validate that all required variables are set
 if not all([DB_HOST, DB_NAME, DB_USER, DB_PASS]):
     raise ValueError("One or more required environment variables are not set.")
 
 
-# --- Function to Fetch IDs from PostgreSQL ---
-def fetch_ids_from_postgres(table_name: str, limit: int) -> List[str]:
-    """Connects to PostgreSQL and fetches the first N GSL IDs from the team table."""
-    conn = None
+# --- PostgreSQL Connection Pool ---
+_pool: Optional[ThreadedConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ThreadedConnectionPool:
+    """Returns the shared connection pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                print("Connecting to PostgreSQL database...")
+                _pool = ThreadedConnectionPool(
+                    1,
+                    POSTGRES_POOL_SIZE,
+                    host=DB_HOST,
+                    dbname=DB_NAME,
+                    user=DB_USER,
+                    password=DB_PASS,
+                    port=DB_PORT,
+                )
+    return _pool
+
+
+def close_pool():
+    """Closes every pooled connection, e.g. on shutdown."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
+            print("Database connections closed.")
+
+
+@contextmanager
+def pooled_connection():
+    """
+    Borrows a pooled connection and ends its transaction before returning it.
+    Connections that raised a database error are discarded.
+    """
+    pool = get_pool()
+    conn = pool.getconn()
+    broken = False
     try:
-        print("Connecting to PostgreSQL database...")
-        conn = psycopg2.connect(
-            host=DB_HOST, dbname=DB_NAME, user=DB_USER, password=DB_PASS, port=DB_PORT
+        yield conn
+    except psycopg2.Error:
+        broken = True
+        raise
+    finally:
+        if not broken:
+            conn.rollback()
+        pool.putconn(conn, close=broken)
+
+
+def _where_clause(
+    filters: Optional[Dict[str, Any]],
+    conditions: Optional[List[sql.Composable]] = None,
+    shard: Optional[Shard] = None,
+) -> Tuple[sql.Composable, List[Any]]:
+    """
+    Builds `WHERE col = %s AND ...` with safely quoted column names. A shard
+    adds the SQL form of `sharding.shard_of`, so only that shard's rows leave
+    the database.
+    """
+    conditions = list(conditions or [])
+    params = []
+    for column, value in (filters or {}).items():
+        conditions.append(sql.SQL("{} = %s").format(sql.Identifier(column)))
+        params.append(value)
+    if shard is not None:
+        conditions.append(
+            sql.SQL(
+                "('x' || substr(md5({}::text), 1, 8))::bit(32)::bigint %% %s = %s"
+            ).format(sql.Identifier("id"))
         )
-        # Use sql.Identifier to safely quote the table name
-        query = sql.SQL("SELECT id FROM {} ORDER BY RANDOM() LIMIT %s").format(
-            sql.Identifier(table_name)
+        params.extend([shard[1], shard[0]])
+    if not conditions:
+        return sql.SQL(""), params
+    return sql.SQL(" WHERE ") + sql.SQL(" AND ").join(conditions), params
+
+
+# --- Stream IDs from PostgreSQL ---
+def _iter_ids_sequential(
+    table_name: str,
+    limit: Optional[int],
+    offset: int,
+    filters: Optional[Dict[str, Any]],
+    shard: Optional[Shard],
+    page_size: int,
+) -> Iterator[str]:
+    """
+    Keyset pagination over `id`: each page seeks past the last ID seen, so
+    every page costs one index range scan however deep into the table it is.
+    The pooled connection is only held while a page is fetched.
+    """
+    table = sql.Identifier(table_name)
+    last_id = None
+    skip = offset
+    remaining = limit
+
+    while remaining is None or remaining > 0:
+        keyset, keyset_params = [], []
+        if last_id is not None:
+            keyset.append(sql.SQL("{} > %s").format(sql.Identifier("id")))
+            keyset_params.append(last_id)
+        where, filter_params = _where_clause(filters, keyset, shard)
+        size = page_size if remaining is None else min(page_size, remaining)
+        query = sql.SQL("SELECT id FROM {}{} ORDER BY id LIMIT %s OFFSET %s").format(
+            table, where
         )
+        # OFFSET only applies to the first page; later pages seek by key
+        params = keyset_params + filter_params + [size, skip]
 
-        with conn.cursor() as cur:
-            # Pass the limit as the only parameter
-            cur.execute(query, (limit,))
-            rows = [item[0] for item in cur.fetchall()]
-            print(f"Successfully fetched {len(rows)} IDs from the database.")
-            return rows
+        with pooled_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(query, params)
+                page = [row[0] for row in cur.fetchall()]
+
+        yield from page
+        if len(page) < size:
+            return
+        last_id = page[-1]
+        skip = 0
+        if remaining is not None:
+            remaining -= len(page)
+
+
+def _iter_ids_sampled(
+    table_name: str,
+    method: str,
+    limit: Optional[int],
+    offset: int,
+    filters: Optional[Dict[str, Any]],
+    sample_percent: float,
+    seed: Optional[int],
+    shard: Optional[Shard],
+    page_size: int,
+) -> Iterator[str]:
+    """
+    Streams a TABLESAMPLE subset through a named server-side cursor. SYSTEM
+    samples whole pages and BERNOULLI individual rows; neither needs to read
+    or sort the rest of the table. A seed makes the subset reproducible.
+    """
+    sample = sql.SQL("TABLESAMPLE {} (%s)").format(sql.SQL(method.upper()))
+    params: List[Any] = [sample_percent]
+    if seed is not None:
+        sample += sql.SQL(" REPEATABLE (%s)")
+        params.append(seed)
+    where, filter_params = _where_clause(filters, shard=shard)
+    query = sql.SQL("SELECT id FROM {} {}{} LIMIT %s OFFSET %s").format(
+        sql.Identifier(table_name), sample, where
+    )
+
+    with pooled_connection() as conn:
+        # A named cursor keeps the sampled rows on the server
+        with conn.cursor(name="er_source_ids") as cur:
+            cur.itersize = page_size
+            # LIMIT NULL means no limit
+            cur.execute(query, params + filter_params + [limit, offset])
+            for row in cur:
+                yield row[0]
+
+
+def iter_ids_from_postgres(
+    table_name: str,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    mode: str = "sequential",
+    filters: Optional[Dict[str, Any]] = None,
+    sample_percent: float = 1.0,
+    seed: Optional[int] = None,
+    shard: Optional[Shard] = None,
+    page_size: int = POSTGRES_ITERSIZE,
+) -> Iterator[str]:
+    """
+    Streams GSL IDs from a table without sorting or scanning all of it.
+    `sequential` reads in `id` order by keyset pagination, so `offset` is
+    stable across runs; `system` and `bernoulli` stream a `sample_percent`
+    TABLESAMPLE. `filters` restricts rows to `column = value` matches and
+    `shard` to one hash partition; `limit`/`offset` apply after both.
+    """
+    if mode not in POSTGRES_MODES:
+        raise ValueError(f"Unknown Postgres retrieval mode: {mode}")
+
+    count = 0
+    try:
+        if mode == "sequential":
+            ids = _iter_ids_sequential(
+                table_name, limit, offset, filters, shard, page_size
+            )
+        else:
+            ids = _iter_ids_sampled(
+                table_name,
+                mode,
+                limit,
+                offset,
+                filters,
+                sample_percent,
+                seed,
+                shard,
+                page_size,
+            )
+        for gsl_id in ids:
+            count += 1
+            yield gsl_id
+        print(f"Successfully streamed {count} IDs from the database.")
 
     except psycopg2.Error as e:
-        print(f"Database error: {e}")
-        return []
-    finally:
-        if conn:
-            conn.close()
-            print("Database connection closed.")
+        print(f"Database error after {count} IDs: {e}")
 
 
-# --- Function to Fetch IDs from CSV ---
-def fetch_ids_from_csv(file_path: str, limit: int = None) -> List[str]:
-    """Reads GSL IDs from a CSV file with a single column named 'source_gsl_id'."""
-    ids = []
+def fetch_ids_from_postgres(
+    table_name: str, limit: Optional[int] = None, offset: int = 0, **options
+) -> List[str]:
+    """Fetches up to N GSL IDs from the table; see `iter_ids_from_postgres`."""
+    return list(iter_ids_from_postgres(table_name, limit, offset, **options))
+
+
+# --- Stream IDs from CSV ---
+def iter_ids_from_csv(
+    file_path: str,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    shard: Optional[Shard] = None,
+) -> Iterator[str]:
+    """
+    Streams GSL IDs from a CSV file with a column named 'source_gsl_id', one
+    row at a time. IDs outside `shard` are dropped before the first `offset`
+    IDs are skipped.
+    """
+    count = 0
     try:
         print(f"Reading IDs from CSV file: {file_path}")
 
         if not os.path.exists(file_path):
             print(f"Error: File '{file_path}' does not exist.")
-            return []
+            return
 
         with open(file_path, "r", newline="", encoding="utf-8") as csvfile:
             reader = csv.DictReader(csvfile)
 
             # Check if the required column exists
-            if "source_gsl_id" not in reader.fieldnames:
+            if "source_gsl_id" not in (reader.fieldnames or []):
                 print(
                     f"Error: Column 'source_gsl_id' not found in CSV. Available columns: {reader.fieldnames}"
                 )
-                return []
+                return
 
+            skipped = 0
             for row in reader:
-                gsl_id = row["source_gsl_id"].strip()  # Remove whitespace
-                if gsl_id:  # Only add non-empty IDs
-                    ids.append(gsl_id)
+                gsl_id = (row["source_gsl_id"] or "").strip()  # Remove whitespace
+                if not gsl_id or not in_shard(gsl_id, shard):
+                    continue
+                if skipped < offset:
+                    skipped += 1
+                    continue
 
-                    # Apply limit if specified
-                    if limit and len(ids) >= limit:
-                        break
+                count += 1
+                yield gsl_id
 
-        print(f"Successfully read {len(ids)} IDs from CSV file.")
-        return ids
+                # Apply limit if specified
+                if limit and count >= limit:
+                    break
+
+        print(f"Successfully read {count} IDs from CSV file.")
 
-    except FileNotFoundError:
-        print(f"Error: File '{file_path}' not found.")
-        return []
     except csv.Error as e:
-        print(f"CSV error: {e}")
-        return []
-    except Exception as e:
-        print(f"Unexpected error reading CSV: {e}")
-        return []
+        print(f"CSV error after {count} IDs: {e}")
+    except OSError as e:
+        print(f"Error reading CSV file '{file_path}': {e}")
+
+
+def fetch_ids_from_csv(
+    file_path: str, limit: Optional[int] = None, offset: int = 0, **options
+) -> List[str]:
+    """Reads GSL IDs from a CSV file with a single column named 'source_gsl_id'."""
+    return list(iter_ids_from_csv(file_path, limit, offset, **options))
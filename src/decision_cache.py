@@ -0,0 +1,292 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+import orjson
+
+from tools import afetch_fixtures_by_ids, afetch_teams_by_ids, to_gsl_id
+
+DECISION_CACHE_PATH = os.getenv("DECISION_CACHE_PATH", ".cache/decisions.sqlite3")
+
+DECISION_FIELDS = ("best_match_gsl_id", "score", "justification")
+
+_HYDRATORS = {"team": afetch_teams_by_ids, "fixture": afetch_fixtures_by_ids}
+
+# Tools whose results are the candidate set; they are rerun on lookup so a
+# newly created duplicate invalidates the decision
+CANDIDATE_SEARCH_TOOLS = {
+    "find_screened_team_candidates",
+    "find_screened_fixture_candidates",
+    "find_fixture_candidates",
+}
+
+
+def _digest(*parts: Any) -> str:
+    """SHA-256 of the canonical (key-sorted) JSON of `parts`."""
+    return hashlib.sha256(
+        orjson.dumps(parts, option=orjson.OPT_SORT_KEYS, default=str)
+    ).hexdigest()
+
+
+def prompt_digest(system_prompt: str) -> str:
+    return hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()
+
+
+# --- Candidate Extraction ---
+
+
+def _observed_ids(payload: Any) -> Iterable[str]:
+    """Yields every entity `id` in a (projected) tool result."""
+    if isinstance(payload, list):
+        for item in payload:
+            yield from _observed_ids(item)
+    elif isinstance(payload, dict):
+        if isinstance(payload.get("id"), str):
+            yield payload["id"]
+        for key in ("candidates", "entities"):
+            yield from _observed_ids(payload.get(key))
+
+
+def _observed_gsl_ids(observation: Any, source_id: str, entity_type: str) -> List[str]:
+    """The GSL IDs in one tool observation, excluding the source."""
+    try:
+        payload = (
+            orjson.loads(observation) if isinstance(observation, str) else observation
+        )
+    except orjson.JSONDecodeError:
+        return []
+    ids = {to_gsl_id(entity_id, entity_type) for entity_id in _observed_ids(payload)}
+    ids.discard(to_gsl_id(source_id, entity_type))
+    return sorted(ids)
+
+
+def candidate_ids_from_steps(
+    intermediate_steps: List[Any], source_id: str, entity_type: str
+) -> List[str]:
+    """Returns the GSL IDs of the candidates the agent saw, excluding the source."""
+    ids = set()
+    for _, observation in intermediate_steps:
+        ids.update(_observed_gsl_ids(observation, source_id, entity_type))
+    return sorted(ids)
+
+
+def searches_from_steps(
+    intermediate_steps: List[Any], source_id: str, entity_type: str
+) -> List[Any]:
+    """Returns each distinct candidate search call with the GSL IDs it returned."""
+    searches = {}
+    for action, observation in intermediate_steps:
+        if getattr(action, "tool", None) in CANDIDATE_SEARCH_TOOLS:
+            call = (action.tool, action.tool_input)
+            searches[_digest(*call)] = [
+                *call,
+                _observed_gsl_ids(observation, source_id, entity_type),
+            ]
+    return [searches[key] for key in sorted(searches)]
+
+
+# --- Content-Addressed Decision Cache ---
+class DecisionCache:
+    """
+    Persists parsed agent decisions in SQLite. An entry is found by
+    (prompt, model, entity type, tool set, source ID) and stores the candidate
+    IDs the agent looked at and the candidate searches it ran. It is only
+    reused if a hash over the current payloads of the source and those
+    candidates, and over the IDs the searches return now, still matches, so
+    any change to the prompt, the model, the source, a candidate or the
+    candidate set forces a fresh agent run.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.enabled = True
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS decisions (
+                    lookup_key TEXT PRIMARY KEY,
+                    entity_type TEXT NOT NULL,
+                    content_key TEXT NOT NULL,
+                    candidate_ids TEXT NOT NULL,
+                    decision TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    searches TEXT NOT NULL DEFAULT '[]'
+                )
+                """
+            )
+            columns = {
+                row[1] for row in self._conn.execute("PRAGMA table_info(decisions)")
+            }
+            if "searches" not in columns:
+                self._conn.execute(
+                    "ALTER TABLE decisions ADD COLUMN searches TEXT NOT NULL DEFAULT '[]'"
+                )
+        return self._conn
+
+    @staticmethod
+    def _lookup_key(context: Dict[str, Any], source_id: str) -> str:
+        return _digest(
+            context["prompt_sha256"],
+            context["model_id"],
+            context["entity_type"],
+            context.get("tools", []),
+            to_gsl_id(source_id, context["entity_type"]),
+        )
+
+    @staticmethod
+    def _content_key(
+        lookup_key: str, entities: Dict[str, Any], searches: List[Any]
+    ) -> str:
+        return _digest(lookup_key, sorted(entities.items()), searches)
+
+    async def _rerun_searches(
+        self,
+        searches: List[Any],
+        tools: Dict[str, Any],
+        source_id: str,
+        entity_type: str,
+    ) -> Optional[List[Any]]:
+        """Reruns recorded searches; None if one of their tools is missing."""
+        if any(name not in tools for name, _, _ in searches):
+            return None
+        observations = await asyncio.gather(
+            *(tools[name].ainvoke(args) for name, args, _ in searches)
+        )
+        return [
+            [name, args, _observed_gsl_ids(observation, source_id, entity_type)]
+            for (name, args, _), observation in zip(searches, observations)
+        ]
+
+    async def lookup(
+        self, context: Dict[str, Any], source_id: str, tools: Iterable[Any]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Returns the cached decision if nothing it was based on has changed.
+        `tools` are the agent's tools, used to rerun its candidate searches.
+        """
+        if not self.enabled:
+            return None
+        entity_type = context["entity_type"]
+        lookup_key = self._lookup_key(context, source_id)
+        with self._lock:
+            row = (
+                self._db()
+                .execute(
+                    "SELECT content_key, candidate_ids, searches, decision FROM decisions WHERE lookup_key = ?",
+                    (lookup_key,),
+                )
+                .fetchone()
+            )
+        if row is None:
+            self.misses += 1
+            return None
+
+        content_key, candidate_ids, searches, decision = row
+        # Read upstream, not the entity cache, so changes are seen immediately
+        entities, searches = await asyncio.gather(
+            _HYDRATORS[entity_type](
+                [source_id, *json.loads(candidate_ids)], fresh=True
+            ),
+            self._rerun_searches(
+                json.loads(searches),
+                {tool.name: tool for tool in tools},
+                source_id,
+                entity_type,
+            ),
+        )
+        if (
+            searches is None
+            or "error" in entities[source_id]
+            or self._content_key(lookup_key, entities, searches) != content_key
+        ):
+            self.stale += 1
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(decision)
+
+    async def record(
+        self,
+        context: Dict[str, Any],
+        source_id: str,
+        intermediate_steps: List[Any],
+        result: Dict[str, Any],
+    ):
+        """
+        Stores a decision together with the candidates and searches it was
+        based on. The payloads hashed are the entity cache copies the agent
+        just read, so recording makes no upstream calls.
+        """
+        if not self.enabled:
+            return
+        entity_type = context["entity_type"]
+        candidate_ids = candidate_ids_from_steps(
+            intermediate_steps, source_id, entity_type
+        )
+        entities = await _HYDRATORS[entity_type]([source_id, *candidate_ids])
+        if "error" in entities[source_id]:
+            return
+
+        lookup_key = self._lookup_key(context, source_id)
+        searches = searches_from_steps(intermediate_steps, source_id, entity_type)
+        decision = {field: result[field] for field in DECISION_FIELDS}
+        with self._lock:
+            conn = self._db()
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO decisions
+                    (lookup_key, entity_type, content_key, candidate_ids, decision, created_at, searches)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    lookup_key,
+                    entity_type,
+                    self._content_key(lookup_key, entities, searches),
+                    json.dumps(candidate_ids),
+                    json.dumps(decision, default=str),
+                    time.time(),
+                    json.dumps(searches, default=str),
+                ),
+            )
+            conn.commit()
+
+    def invalidate(self, entity_type: Optional[str] = None):
+        """Drops every cached decision, or only those of one entity type."""
+        with self._lock:
+            conn = self._db()
+            if entity_type:
+                conn.execute(
+                    "DELETE FROM decisions WHERE entity_type = ?", (entity_type,)
+                )
+            else:
+                conn.execute("DELETE FROM decisions")
+            conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+decision_cache = DecisionCache(DECISION_CACHE_PATH)
@@ -1,75 +1,485 @@
+import asyncio
 import csv
-from typing import List
+import itertools
+import os
+import threading
+import time
+from collections import Counter
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+import numpy as np
 
 # LangChain Imports...
+from langchain_core.messages import SystemMessage
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_aws import ChatBedrock
-from langchain.agents import AgentExecutor, create_tool_calling_agent
+from langchain_core.runnables import RunnableLambda, RunnablePassthrough
+from langchain_aws import ChatBedrock, ChatBedrockConverse
+from langchain_aws.utils import create_aws_client
+from botocore.config import Config
+from langchain.agents import AgentExecutor
+from langchain.agents.format_scratchpad.tools import format_to_tool_messages
+from langchain.agents.output_parsers.tools import ToolsAgentOutputParser
 
 from dotenv import load_dotenv
 
 load_dotenv()
 
-from tools import get_agent_tools, add_multiple_numbers
-from util import parse_agent_output
+from tools import (
+    get_agent_tools,
+    find_matching_teams,
+    afetch_teams_by_ids,
+    find_screened_fixture_candidates,
+)
+from scoring import (
+    MATCH_THRESHOLD,
+    TEAM_WEIGHTED_RULES,
+    score_team_candidates,
+    format_weighted_result,
+)
+from final_answer import (
+    MatchDecision,
+    decision_to_result,
+    parse_final_answer,
+    submit_match,
+)
+from journal import ProgressJournal, journal_path_for
 from data_sources import fetch_ids_from_postgres, fetch_ids_from_csv
 from sys_prompts import get_entity_matching_system_prompt
+from decision_cache import decision_cache, prompt_digest
+from pydantic import Field
+from prompt_cache import BEDROCK_PROMPT_CACHE, PromptCacheUsage, add_cache_points
+from model_routing import (
+    BEDROCK_FALLBACK_MODEL_ID,
+    BEDROCK_FAST_MODEL_ID,
+    ModelRouter,
+    governed,
+)
+from rate_limit import MATCH_DEADLINE_SECONDS, with_deadline
+from http_client import aclose_clients, run_closing_client
+
+
+BEDROCK_MODEL_ID = os.getenv(
+    "BEDROCK_MODEL_ID", "anthropic.claude-3-5-sonnet-20240620-v1:0"
+)
+# Connections kept open by the shared bedrock-runtime client
+BEDROCK_MAX_POOL_CONNECTIONS = int(os.getenv("BEDROCK_MAX_POOL_CONNECTIONS", "50"))
+# Half-width of the score band around MATCH_THRESHOLD escalated to the LLM
+TIER_AMBIGUITY_BAND = float(os.getenv("TIER_AMBIGUITY_BAND", "0.5"))
+
+# How a result was decided (the `tier` column)
+TIER_MATCH = "match"
+TIER_NO_MATCH = "no_match"
+TIER_LLM = "llm"
+TIER_NATIVE = "native"
+TIER_CACHED = "cached"
+TIER_ERROR = "error"
+
+_bedrock_client = None
+_bedrock_client_lock = threading.Lock()
+
+
+# --- Shared Bedrock Client ---
+
+
+def get_bedrock_client():
+    """
+    Returns the bedrock-runtime client shared by every agent, created on first
+    use with the same region/profile resolution ChatBedrock uses by default.
+    """
+    global _bedrock_client
+    if _bedrock_client is None:
+        with _bedrock_client_lock:
+            if _bedrock_client is None:
+                _bedrock_client = create_aws_client(
+                    "bedrock-runtime",
+                    # Retries are left to the rate governor, which must see
+                    # every throttle to adapt its concurrency limit
+                    config=Config(
+                        max_pool_connections=BEDROCK_MAX_POOL_CONNECTIONS,
+                        retries={"total_max_attempts": 1},
+                    ),
+                )
+    return _bedrock_client
 
 
 # --- Create the Agent with a Prompt ---
 
 
-def create_entity_matching_agent(scoring_prompt: str, tools: list):
-    """Creates an agent with a specific scoring prompt and tools."""
+class MatchingAgentExecutor(AgentExecutor):
+    """
+    An AgentExecutor whose run ends only on a valid `submit_match` call; a
+    rejected submission goes back to the model like any other observation.
+    `prompt_usage` totals the token usage of this executor's model calls.
+    """
 
-    llm = ChatBedrock(
-        model_id="anthropic.claude-3-5-sonnet-20240620-v1:0",
+    prompt_usage: PromptCacheUsage = Field(default_factory=PromptCacheUsage)
+
+    def _get_tool_return(self, next_step_output):
+        tool_return = super()._get_tool_return(next_step_output)
+        if tool_return and not isinstance(next_step_output[1], MatchDecision):
+            return None
+        return tool_return
+
+
+def _chat_model(model_id: str, client, prompt_cache: bool, usage: PromptCacheUsage):
+    if prompt_cache:
+        # Only the Converse API keeps cache checkpoints in the system prompt
+        return ChatBedrockConverse(
+            model_id=model_id,
+            temperature=0.0,
+            client=client,
+            callbacks=[usage],
+        )
+    return ChatBedrock(
+        model_id=model_id,
         model_kwargs={"temperature": 0.0},
+        client=client,
+        callbacks=[usage],
     )
 
+
+def create_entity_matching_agent(
+    scoring_prompt: str,
+    tools: list,
+    client=None,
+    entity_type: Optional[str] = None,
+    prompt_cache: bool = BEDROCK_PROMPT_CACHE,
+    fast_model_id: Optional[str] = BEDROCK_FAST_MODEL_ID,
+    fallback_model_id: Optional[str] = BEDROCK_FALLBACK_MODEL_ID,
+):
+    """
+    Creates an agent with a specific scoring prompt and tools. With
+    `entity_type`, the executor carries the metadata the decision cache keys on.
+    With `prompt_cache`, requests go through the Converse API with cache
+    checkpoints after the system prompt and the source entity fetch. With a
+    fast or fallback model ID, each turn is routed by a ModelRouter. Every
+    model call goes through the shared Bedrock rate governor.
+    """
+    client = client or get_bedrock_client()
+    usage = PromptCacheUsage()
+    model_ids = [BEDROCK_MODEL_ID, fast_model_id, fallback_model_id]
+    model_ids = list(dict.fromkeys(model_id for model_id in model_ids if model_id))
+    if len(model_ids) > 1:
+        model = ModelRouter(
+            {
+                model_id: _chat_model(model_id, client, prompt_cache, usage)
+                for model_id in model_ids
+            },
+            tools,
+            BEDROCK_MODEL_ID,
+            fast_model_id,
+            fallback_model_id,
+        ).as_runnable()
+    else:
+        model = governed(
+            _chat_model(BEDROCK_MODEL_ID, client, prompt_cache, usage).bind_tools(tools)
+        )
+
     prompt = ChatPromptTemplate.from_messages(
         [
-            ("system", scoring_prompt),
+            # Not a template: the final answer examples contain JSON braces
+            SystemMessage(content=scoring_prompt),
             ("human", "{input}"),
             MessagesPlaceholder(variable_name="agent_scratchpad"),
         ]
     )
 
-    agent = create_tool_calling_agent(llm, tools, prompt)
-    return AgentExecutor(agent=agent, tools=tools, verbose=True, max_iterations=25)
+    # The create_tool_calling_agent chain, with optional cache checkpoints
+    # and model routing
+    agent = (
+        RunnablePassthrough.assign(
+            agent_scratchpad=lambda x: format_to_tool_messages(x["intermediate_steps"])
+        )
+        | prompt
+    )
+    if prompt_cache:
+        agent = agent | RunnableLambda(add_cache_points)
+    agent = agent | model | ToolsAgentOutputParser()
+
+    metadata = None
+    if entity_type:
+        metadata = {
+            "entity_type": entity_type.lower(),
+            "model_id": "+".join(model_ids),
+            "prompt_sha256": prompt_digest(scoring_prompt),
+            "tools": sorted(tool.name for tool in tools),
+        }
+    return MatchingAgentExecutor(
+        agent=agent,
+        tools=tools,
+        verbose=True,
+        max_iterations=25,
+        metadata=metadata,
+        return_intermediate_steps=True,
+        prompt_usage=usage,
+    )
+
+
+class NativeMatchingExecutor:
+    """
+    Stands in for an AgentExecutor but scores candidates in-process with the
+    deterministic weighted rubric, so no LLM call is made.
+    """
+
+    def __init__(self, entity_type: str):
+        if entity_type.lower() != "team":
+            raise ValueError(
+                f"Native weighted scoring is not supported for entity type: {entity_type}"
+            )
+        self.entity_type = entity_type.lower()
+        # Makes no model calls; kept for the same stats interface
+        self.prompt_usage = PromptCacheUsage()
+
+    async def ascore(self, source_id: str) -> Tuple[List[Dict[str, Any]], np.ndarray]:
+        """Returns the candidates found by the source's name and their rule points."""
+        source = (await afetch_teams_by_ids([source_id]))[source_id]
+        if "error" in source:
+            raise ValueError(source["error"])
+
+        search_results = []
+        if source.get("name"):
+            search_results = await find_matching_teams.ainvoke(
+                {"source_team_id": source_id, "search_term": source["name"]}
+            )
+        hydrated = await afetch_teams_by_ids([item["id"] for item in search_results])
+        candidates = [entity for entity in hydrated.values() if "error" not in entity]
+        return candidates, score_team_candidates(source, candidates)
+
+    async def ainvoke(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        candidates, points = await self.ascore(inputs["source_id"])
+        return {
+            "output": format_weighted_result(candidates, points, TEAM_WEIGHTED_RULES),
+            "tier": TIER_NATIVE,
+        }
+
+    def invoke(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        return run_closing_client(self.ainvoke(inputs))
+
+
+class TieredMatcher:
+    """
+    Scores each source with the native weighted rubric first and only invokes
+    the LLM agent when the best candidate's score falls within
+    `ambiguity_band` of MATCH_THRESHOLD. Clear matches and clear non-matches
+    are answered in-process. There is no native fixture scorer, so fixtures
+    are always escalated.
+    """
+
+    def __init__(
+        self, entity_type: str, agent, ambiguity_band: float = TIER_AMBIGUITY_BAND
+    ):
+        self.entity_type = entity_type.lower()
+        self.agent = agent
+        self.ambiguity_band = max(ambiguity_band, 0.0)
+        self.scorer = (
+            NativeMatchingExecutor(self.entity_type)
+            if self.entity_type == "team"
+            else None
+        )
+
+    @property
+    def metadata(self) -> Optional[Dict[str, Any]]:
+        # Escalated decisions are cached under the agent's key
+        return getattr(self.agent, "metadata", None)
+
+    @property
+    def prompt_usage(self) -> PromptCacheUsage:
+        return self.agent.prompt_usage
+
+    async def ainvoke(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        if self.scorer:
+            candidates, points = await self.scorer.ascore(inputs["source_id"])
+            tier = None
+            # With no candidates under the exact name, only the agent can try
+            # other spellings and search terms, so that case is escalated too
+            if len(candidates):
+                best = float(points.sum(axis=1).max())
+                if best >= MATCH_THRESHOLD + self.ambiguity_band:
+                    tier = TIER_MATCH
+                elif best < MATCH_THRESHOLD - self.ambiguity_band:
+                    tier = TIER_NO_MATCH
+            if tier:
+                return {
+                    "output": format_weighted_result(
+                        candidates, points, TEAM_WEIGHTED_RULES
+                    ),
+                    "tier": tier,
+                }
+        return await _ainvoke_agent(self.agent, inputs)
+
+    def invoke(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        return run_closing_client(self.ainvoke(inputs))
+
+
+def build_agent(
+    entity_type: str,
+    scoring_method: str,
+    fixture_index_path: Optional[str] = None,
+    prompt_cache: bool = BEDROCK_PROMPT_CACHE,
+    ambiguity_band: Optional[float] = None,
+):
+    """
+    Builds the executor for a scoring method: the native scorer for
+    `weighted-native`, otherwise an LLM agent with the entity type's tools.
+    With `ambiguity_band`, the weighted agent is wrapped in a TieredMatcher.
+    Returns None if the combination is not supported.
+    """
+    entity_type = entity_type.lower()
+    if scoring_method == "weighted-native":
+        if entity_type != "team":
+            print("Error: weighted-native scoring is only available for teams.")
+            return None
+        return NativeMatchingExecutor(entity_type)
+
+    data_tools = [*get_agent_tools(entity_type), submit_match]
+    if fixture_index_path and entity_type == "fixture":
+        # Structured index lookups replace free-text candidate search
+        from fixture_index import find_fixture_candidates, load_fixture_index
+
+        load_fixture_index(fixture_index_path)
+        data_tools = [
+            (
+                find_fixture_candidates
+                if tool is find_screened_fixture_candidates
+                else tool
+            )
+            for tool in data_tools
+        ]
+    if not data_tools:
+        print(f"Error: Invalid entity type '{entity_type}'.")
+        return None
+
+    agent_prompt = get_entity_matching_system_prompt(
+        scoring_method=scoring_method, entity_type=entity_type
+    )
+    agent = create_entity_matching_agent(
+        scoring_prompt=agent_prompt,
+        tools=data_tools,
+        entity_type=entity_type,
+        prompt_cache=prompt_cache,
+    )
+    if ambiguity_band is None:
+        return agent
+    if scoring_method != "weighted":
+        print("Error: tiered matching is only available for weighted scoring.")
+        return None
+    if entity_type != "team":
+        print("Note: there is no native fixture scorer; every fixture is escalated.")
+    return TieredMatcher(entity_type, agent, ambiguity_band)
 
 
 # --- Main Batch Processing Logic ---
 
+RESULT_FIELDS = [
+    "source_gsl_id",
+    "best_match_gsl_id",
+    "score",
+    "justification",
+    "tier",
+]
+
+
+def _build_user_input(source_id: str) -> str:
+    """Builds the agent instruction for a single source ID."""
+    return f"Please research and compare the entity with GSL ID {source_id} to find the best merge candidate. Follow your instructions precisely."
+
+
+def _extract_output_text(response: Dict[str, Any]) -> str:
+    """Pulls the final answer text out of an agent response."""
+    output_data = response.get("output", [])
+    output_text = ""
+    if isinstance(output_data, list) and output_data:
+        if isinstance(output_data[0], dict) and "text" in output_data[0]:
+            output_text = output_data[0]["text"]
+    elif isinstance(output_data, str):
+        output_text = output_data
+    return output_text
+
+
+def _decision_context(agent_executor) -> Optional[Dict[str, Any]]:
+    """The decision cache key context of an executor, if it has one."""
+    metadata = getattr(agent_executor, "metadata", None) or {}
+    if {"entity_type", "model_id", "prompt_sha256"} <= metadata.keys():
+        return metadata
+    return None
+
+
+async def _ainvoke_agent(agent_executor, inputs: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Invokes the agent, unless the decision cache holds a decision for the
+    source that is still valid.
+    """
+    context = _decision_context(agent_executor)
+    if context:
+        cached = await decision_cache.lookup(
+            context, inputs["source_id"], agent_executor.tools
+        )
+        if cached:
+            return {"decision": cached, "tier": TIER_CACHED}
+    return {"tier": TIER_LLM, **await agent_executor.ainvoke(inputs)}
+
+
+async def _match_source(agent_executor: AgentExecutor, source_id: str):
+    """Runs the cache lookup, the agent and the cache write for one source ID."""
+    inputs = {"input": _build_user_input(source_id), "source_id": source_id}
+    if isinstance(agent_executor, TieredMatcher):
+        # Only consults the decision cache when it escalates to the agent
+        response = await agent_executor.ainvoke(inputs)
+    else:
+        response = await _ainvoke_agent(agent_executor, inputs)
+    if response["tier"] == TIER_CACHED:
+        print(f"--- Result for {source_id}: Reused cached decision ---")
+        return {"source_gsl_id": source_id, **response["decision"], "tier": TIER_CACHED}
+
+    decision = response.get("output")
+    if not isinstance(decision, MatchDecision):
+        # The native scorer, or a model that answered without submit_match
+        decision = parse_final_answer(_extract_output_text(response))
+
+    result = {
+        "source_gsl_id": source_id,
+        **decision_to_result(decision),
+        "tier": response["tier"],
+    }
+
+    print(
+        f"--- Result for {source_id}: Found match '{result['best_match_gsl_id']}' ({result['tier']}) ---"
+    )
+    # Only decisions the agent made are cached under the agent's key
+    context = _decision_context(agent_executor)
+    if context and result["tier"] == TIER_LLM:
+        await decision_cache.record(
+            context, source_id, response.get("intermediate_steps", []), result
+        )
+    return result
+
 
 async def run_single_process(agent_executor: AgentExecutor, source_id: str):
-    """Processes a single source ID with the agent and returns the result."""
+    """
+    Processes a single source ID with the agent and returns the result. A
+    decision cached for the same prompt, model and entity payloads is returned
+    without invoking the agent. A run, including its rate-limit retries, that
+    takes longer than MATCH_DEADLINE_SECONDS is abandoned as an error.
+    """
     if not source_id:
         print("Error: No source ID provided.")
         return None
 
     print(f"\n--- Processing Source GSL ID: {source_id} ---")
-    user_input = f"Please research and compare the entity with GSL ID {source_id} to find the best merge candidate. Follow your instructions precisely."
-
     try:
-        response = await agent_executor.ainvoke({"input": user_input})
-        output_data = response.get("output", [])
-        output_text = ""
-        if isinstance(output_data, list) and output_data:
-            if isinstance(output_data[0], dict) and "text" in output_data[0]:
-                output_text = output_data[0]["text"]
-        elif isinstance(output_data, str):
-            output_text = output_data
-
-        best_match_id, justification, score = parse_agent_output(output_text)
-
-        print(f"--- Result for {source_id}: Found match '{best_match_id}' ---")
-        return {
-            "source_gsl_id": source_id,
-            "best_match_gsl_id": best_match_id,
-            "score": score,
-            "justification": justification,
-        }
+        return await with_deadline(
+            _match_source(agent_executor, source_id), MATCH_DEADLINE_SECONDS
+        )
 
     except Exception as e:
         print(f"!! An error occurred while processing {source_id}: {e} !!")
@@ -78,48 +488,213 @@ async def run_single_process(agent_executor: AgentExecutor, source_id: str):
             "best_match_gsl_id": "processing error",
             "score": str(e),
             "justification": "",
+            "tier": TIER_ERROR,
         }
 
 
-def run_batch_process(
-    agent_executor: AgentExecutor, source_ids: List[str], output_file: str
-):
-    """Processes a list of source IDs with the agent and writes results to a CSV."""
-    print(f"Starting batch process for {len(source_ids)} IDs...")
-
-    with open(output_file, mode="w", newline="", encoding="utf-8") as outfile:
-        writer = csv.writer(outfile)
-        writer.writerow(
-            ["source_gsl_id", "best_match_gsl_id", "score", "justification"]
+class BatchProgress:
+    """Tracks started/completed counts and throughput for a batch run."""
+
+    def __init__(self):
+        self.started = 0
+        self.completed = 0
+        self.errors = 0
+        self.tiers = Counter()
+        self.start_time = time.monotonic()
+
+    @property
+    def in_flight(self) -> int:
+        return self.started - self.completed
+
+    def record(self, result: Dict[str, Any]):
+        self.completed += 1
+        if result.get("best_match_gsl_id") == "processing error":
+            self.errors += 1
+        if result.get("tier"):
+            self.tiers[result["tier"]] += 1
+
+    def report(self) -> str:
+        elapsed = max(time.monotonic() - self.start_time, 1e-9)
+        rate = self.completed / elapsed * 60
+        tiers = ",".join(
+            f"{tier}:{count}" for tier, count in sorted(self.tiers.items())
         )
+        return (
+            f"[progress] completed={self.completed} in_flight={self.in_flight} "
+            f"errors={self.errors} tiers={tiers or '-'} elapsed={elapsed:.0f}s "
+            f"throughput={rate:.1f}/min"
+        )
+
 
+# IDs read per worker-thread hop from a blocking source
+SOURCE_PULL_SIZE = 100
+
+
+async def aiter_source_ids(
+    source_ids: Union[Iterable[str], AsyncIterable[str]],
+) -> AsyncIterator[str]:
+    """
+    Yields the non-empty IDs of an async or sync source. A sync source (a CSV
+    reader, a Postgres cursor) is read in a worker thread, a chunk at a time,
+    so its blocking reads never stall the event loop.
+    """
+    if isinstance(source_ids, AsyncIterable):
+        async for source_id in source_ids:
+            if source_id:
+                yield source_id
+        return
+    if isinstance(source_ids, (list, tuple)):
         for source_id in source_ids:
-            if not source_id:
-                continue
+            if source_id:
+                yield source_id
+        return
+
+    source_iter = iter(source_ids)
+    while chunk := await asyncio.to_thread(
+        lambda: list(itertools.islice(source_iter, SOURCE_PULL_SIZE))
+    ):
+        for source_id in chunk:
+            if source_id:
+                yield source_id
+
+
+async def iter_results_as_completed(
+    agent_executor: AgentExecutor,
+    source_ids: Union[Iterable[str], AsyncIterable[str]],
+    concurrency: int = 1,
+    progress: Optional[BatchProgress] = None,
+) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Runs the agent over source IDs with at most `concurrency` runs in flight and
+    yields (input_index, result) pairs in completion order.
+    """
+    progress = progress or BatchProgress()
+    results: asyncio.Queue = asyncio.Queue()
+    source_iter = aiter_source_ids(source_ids)
+    pull_lock = asyncio.Lock()
+    index_counter = itertools.count()
+
+    async def worker():
+        while True:
+            # The iterator is shared between workers; the lock serializes
+            # pulls and keeps indexes in input order.
+            async with pull_lock:
+                source_id = await anext(source_iter, None)
+                if source_id is None:
+                    return
+                index = next(index_counter)
+            progress.started += 1
+            result = await run_single_process(agent_executor, source_id)
+            await results.put((index, result))
+
+    async def run_workers():
+        try:
+            await asyncio.gather(*(worker() for _ in range(max(concurrency, 1))))
+        finally:
+            await results.put(None)
+
+    runner = asyncio.create_task(run_workers())
+    try:
+        while (item := await results.get()) is not None:
+            progress.record(item[1])
+            yield item
+        await runner
+    finally:
+        if not runner.done():
+            runner.cancel()
+
+
+async def run_batch_process_async(
+    agent_executor: AgentExecutor,
+    source_ids: Union[Iterable[str], AsyncIterable[str]],
+    output_file: str,
+    concurrency: int = 1,
+    preserve_order: bool = False,
+    resume: bool = False,
+):
+    """
+    Processes source IDs concurrently via `ainvoke` and writes each result to the
+    CSV as soon as it completes (or in input order when `preserve_order` is set).
+    Every result is also recorded in a progress journal next to the CSV; with
+    `resume`, IDs the journal already has as completed are skipped.
+    """
+    print(f"Starting batch process with concurrency {concurrency}...")
+    progress = BatchProgress()
+    journal = ProgressJournal(journal_path_for(output_file))
+
+    if resume:
+        completed_ids = journal.completed_ids()
+        print(f"Resuming: skipping {len(completed_ids)} already completed IDs.")
+        source_ids = (
+            sid
+            async for sid in aiter_source_ids(source_ids)
+            if sid not in completed_ids
+        )
 
-            print(f"\n--- Processing Source GSL ID: {source_id} ---")
-            user_input = f"Please research and compare the entity with GSL ID {source_id} to find the best merge candidate. Follow your instructions precisely."
+    append_rows = resume and os.path.exists(output_file)
+    journal.open(resume=resume)
+    try:
+        with open(
+            output_file, mode="a" if append_rows else "w", newline="", encoding="utf-8"
+        ) as outfile:
+            writer = csv.writer(outfile)
+            if not append_rows:
+                writer.writerow(RESULT_FIELDS)
+
+            def write_result(result: Dict[str, Any]):
+                writer.writerow([result.get(field, "") for field in RESULT_FIELDS])
+                outfile.flush()
+
+            pending: Dict[int, Dict[str, Any]] = {}
+            next_index = 0
+
+            async for index, result in iter_results_as_completed(
+                agent_executor, source_ids, concurrency, progress
+            ):
+                journal.append(result)
+                if preserve_order:
+                    pending[index] = result
+                    while next_index in pending:
+                        write_result(pending.pop(next_index))
+                        next_index += 1
+                else:
+                    write_result(result)
+                print(progress.report())
+    finally:
+        journal.close()
+
+    if resume:
+        # Retried rows were appended after their old error rows; keep only the latest.
+        journal.write_csv(output_file, RESULT_FIELDS)
 
-            try:
-                response = agent_executor.invoke({"input": user_input})
-                output_data = response.get("output", [])
-                output_text = ""
-                if isinstance(output_data, list) and output_data:
-                    if isinstance(output_data[0], dict) and "text" in output_data[0]:
-                        output_text = output_data[0]["text"]
-                elif isinstance(output_data, str):
-                    output_text = output_data
+    print(f"\nBatch process complete. Results saved to '{output_file}'.")
+    print(progress.report())
 
-                best_match_id, justification, score = parse_agent_output(output_text)
 
-                print(f"--- Result for {source_id}: Found match '{best_match_id}' ---")
-                writer.writerow([source_id, best_match_id, score, justification])
+def run_batch_process(
+    agent_executor: AgentExecutor,
+    source_ids: Union[Iterable[str], AsyncIterable[str]],
+    output_file: str,
+    concurrency: int = 1,
+    preserve_order: bool = False,
+    resume: bool = False,
+):
+    """Processes a list of source IDs with the agent and writes results to a CSV."""
 
-            except Exception as e:
-                print(f"!! An error occurred while processing {source_id}: {e} !!")
-                writer.writerow([source_id, "processing error", str(e), ""])
+    async def run():
+        try:
+            await run_batch_process_async(
+                agent_executor,
+                source_ids,
+                output_file,
+                concurrency,
+                preserve_order,
+                resume,
+            )
+        finally:
+            await aclose_clients()
 
-    print(f"\nBatch process complete. Results saved to '{output_file}'.")
+    asyncio.run(run())
 
 
 if __name__ == "__main__":
@@ -134,10 +709,8 @@ if __name__ == "__main__":
         # Create an agent with the default weighted prompt
         entity_matching_agent = create_entity_matching_agent(
             get_entity_matching_system_prompt("weighted", "fixture"),
-            [
-                *get_agent_tools("fixture"),
-                add_multiple_numbers,
-            ],
+            [*get_agent_tools("fixture"), submit_match],
+            entity_type="fixture",
         )
         run_batch_process(
             agent_executor=entity_matching_agent,
@@ -0,0 +1,129 @@
+import base64
+import json
+import re
+from typing import List
+
+from langchain_core.tools import StructuredTool
+from pydantic import (
+    BaseModel,
+    Field,
+    ValidationError,
+    field_validator,
+    model_validator,
+)
+
+NO_MATCH = "no match found"
+
+
+def decode_match_id(match_id: str) -> str:
+    """Returns the raw GSL ID for either a raw ID or a base64 searchable ID."""
+    try:
+        decoded_id = base64.b64decode(match_id, validate=True).decode("utf-8")
+    except Exception:
+        return match_id
+    match = re.fullmatch(r"GSLSearchable(?:Team|Fixture)(.+)", decoded_id)
+    return match.group(1) if match else match_id
+
+
+class RuleResult(BaseModel):
+    rule: str = Field(description="The rule label, as listed in the audit.")
+    passed: bool = Field(description="Whether the winning candidate passed the rule.")
+    points: float = Field(ge=0, description="The points awarded for the rule.")
+
+    @model_validator(mode="after")
+    def failed_rules_award_nothing(self):
+        if not self.passed and self.points != 0:
+            raise ValueError(f"failed rule '{self.rule}' awards {self.points} points")
+        return self
+
+
+class MatchDecision(BaseModel):
+    """The agent's final answer; the total score is summed here, not by the model."""
+
+    best_match_id: str = Field(
+        description=f"The id of the best match, or '{NO_MATCH}'. Searchable (base64) ids are decoded to GSL ids."
+    )
+    rules: List[RuleResult] = Field(
+        default_factory=list,
+        description="The audit result of every rule for the best match.",
+    )
+    justification: str = Field(default="", description="A short explanation.")
+
+    @field_validator("best_match_id")
+    @classmethod
+    def decode_best_match_id(cls, value: str) -> str:
+        value = value.strip()
+        if value.lower() == NO_MATCH:
+            return NO_MATCH
+        return decode_match_id(value)
+
+    @model_validator(mode="after")
+    def match_has_rules(self):
+        if self.is_match and not self.rules:
+            raise ValueError("a best match must list its rule results")
+        return self
+
+    @property
+    def is_match(self) -> bool:
+        return self.best_match_id != NO_MATCH
+
+    @property
+    def score(self) -> float:
+        if not self.is_match:
+            return 0
+        return round(sum(rule.points for rule in self.rules), 2)
+
+    def checklist(self) -> str:
+        lines = [
+            f"* {r.rule}: {'Pass' if r.passed else 'Fail'}, Score: {r.points:g}"
+            for r in self.rules
+        ]
+        if self.justification:
+            lines.append(self.justification)
+        return "\n".join(lines)
+
+
+def parse_final_answer(output_text: str) -> MatchDecision:
+    """
+    Validates the JSON final answer in the agent's output. Code fences or text
+    around the JSON object are ignored; anything else raises a ValueError.
+    """
+    start, end = output_text.find("{"), output_text.rfind("}")
+    if start == -1 or end < start:
+        raise ValueError("final answer contains no JSON object")
+    try:
+        return MatchDecision.model_validate(json.loads(output_text[start : end + 1]))
+    except (json.JSONDecodeError, ValidationError) as e:
+        raise ValueError(f"invalid final answer: {e}") from e
+
+
+def decision_to_result(decision: MatchDecision) -> dict:
+    """The `best_match_gsl_id`/`score`/`justification` fields of a result row."""
+    return {
+        "best_match_gsl_id": decision.best_match_id,
+        "score": f"{decision.score:g}",
+        "justification": decision.checklist(),
+    }
+
+
+# --- Terminal Tool: Submit Match ---
+
+
+def _reject_submission(error: ValidationError) -> str:
+    return f"Invalid submission, nothing was recorded: {error}. Fix the arguments and call submit_match again."
+
+
+def _submit_match(**decision) -> MatchDecision:
+    return MatchDecision(**decision)
+
+
+# The agent loop ends as soon as a valid decision is submitted; a submission
+# that fails the schema is returned to the model as an observation instead.
+submit_match = StructuredTool.from_function(
+    func=_submit_match,
+    name="submit_match",
+    description="Submits the final answer: the best match id (or 'no match found') and the result and points of every audit rule. The score is summed from the rule points.",
+    args_schema=MatchDecision,
+    return_direct=True,
+    handle_validation_error=_reject_submission,
+)
@@ -0,0 +1,277 @@
+import argparse
+import bisect
+import json
+import os
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from pydantic import BaseModel, Field
+
+from projection import serialize_screened_candidates
+from tools import (
+    tool_with_coroutine,
+    fetch_fixtures_by_ids,
+    afetch_fixtures_by_ids,
+    screen_candidates,
+    to_gsl_id,
+)
+
+# Candidates must fall within this many days of the source fixture's localDate
+DATE_WINDOW_DAYS = 1
+# Fixtures of the same teams may be up to this many days away (rescheduled or
+# mis-dated fixtures); without a date on either side both teams must match
+TEAM_DATE_WINDOW_DAYS = 7
+
+
+def _parse_local_date(value: Any) -> Optional[date]:
+    """Parses the date part of a `localDate` value, or returns None."""
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(str(value)[:10])
+    except ValueError:
+        return None
+
+
+def _month_bucket(day: date) -> str:
+    return f"{day.year:04d}-{day.month:02d}"
+
+
+def _team_id(team: Any) -> Optional[str]:
+    return (team or {}).get("id") or None
+
+
+# --- Fixture Blocking Index ---
+class FixtureIndex:
+    """
+    Blocking index for fixture candidate generation. Fixtures are bucketed by
+    (sport, month) into sorted date arrays for bisect range lookups, and an
+    inverted index maps each home/away team ID to its fixture IDs.
+    """
+
+    def __init__(self):
+        # (sport, month) -> sorted list of (date ordinal, fixture id)
+        self._buckets: Dict[Tuple[Optional[str], str], List[Tuple[int, str]]] = (
+            defaultdict(list)
+        )
+        self._team_fixtures: Dict[str, Set[str]] = defaultdict(set)
+        self._fixtures: Dict[str, Dict[str, Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._fixtures)
+
+    def add(self, fixture: Dict[str, Any]):
+        """Indexes one fixture payload (as returned by `get_fixture_by_id`)."""
+        fixture_id = fixture.get("id")
+        if not fixture_id or "error" in fixture or fixture_id in self._fixtures:
+            return
+
+        record = {
+            "id": fixture_id,
+            "sport": fixture.get("sport") or None,
+            "localDate": fixture.get("localDate"),
+            "homeTeamId": fixture.get("homeTeamId")
+            or _team_id(fixture.get("homeTeam")),
+            "awayTeamId": fixture.get("awayTeamId")
+            or _team_id(fixture.get("awayTeam")),
+        }
+        self._fixtures[fixture_id] = record
+
+        local_date = _parse_local_date(record["localDate"])
+        if local_date:
+            bucket = self._buckets[(record["sport"], _month_bucket(local_date))]
+            bisect.insort(bucket, (local_date.toordinal(), fixture_id))
+
+        for team_id in (record["homeTeamId"], record["awayTeamId"]):
+            if team_id:
+                self._team_fixtures[team_id].add(fixture_id)
+
+    def add_many(self, fixtures: Iterable[Dict[str, Any]]):
+        for fixture in fixtures:
+            self.add(fixture)
+
+    def _sports_to_search(self, sport: Optional[str]) -> Set[Optional[str]]:
+        # A null sport on either side is never a pre-screen mismatch
+        if sport is None:
+            return {bucket_sport for bucket_sport, _ in self._buckets}
+        return {sport, None}
+
+    def _sport_compatible(self, fixture_id: str, sport: Optional[str]) -> bool:
+        candidate_sport = self._fixtures[fixture_id]["sport"]
+        return sport is None or candidate_sport is None or candidate_sport == sport
+
+    def _near_date(
+        self, fixture_id: str, local_date: Optional[date], window_days: int
+    ) -> Optional[bool]:
+        """Whether the fixture is within `window_days`, or None if a date is missing."""
+        candidate_date = _parse_local_date(self._fixtures[fixture_id]["localDate"])
+        if local_date is None or candidate_date is None:
+            return None
+        return abs((candidate_date - local_date).days) <= window_days
+
+    def candidates(
+        self,
+        source: Dict[str, Any],
+        window_days: int = DATE_WINDOW_DAYS,
+        team_window_days: int = TEAM_DATE_WINDOW_DAYS,
+    ) -> List[str]:
+        """
+        Returns IDs of fixtures that can plausibly score against `source`: a
+        compatible sport and either a localDate within `window_days`, or a
+        shared home/away team and a localDate within `team_window_days`. When
+        either fixture has no date, a team hit must share both teams.
+        """
+        sport = source.get("sport") or None
+        found: Set[str] = set()
+
+        local_date = _parse_local_date(source.get("localDate"))
+        if local_date:
+            start = local_date - timedelta(days=window_days)
+            end = local_date + timedelta(days=window_days)
+            months = {
+                _month_bucket(start + timedelta(days=offset))
+                for offset in range((end - start).days + 1)
+            }
+            low, high = (start.toordinal(), ""), (end.toordinal(), "\uffff")
+            for bucket_sport in self._sports_to_search(sport):
+                for month in months:
+                    bucket = self._buckets.get((bucket_sport, month), [])
+                    lo = bisect.bisect_left(bucket, low)
+                    hi = bisect.bisect_right(bucket, high)
+                    found.update(fixture_id for _, fixture_id in bucket[lo:hi])
+
+        team_sets = [
+            self._team_fixtures.get(_team_id(team), set())
+            for team in (source.get("homeTeam"), source.get("awayTeam"))
+        ]
+        both_teams = team_sets[0] & team_sets[1]
+        for fixture_id in team_sets[0] | team_sets[1]:
+            if fixture_id in found or not self._sport_compatible(fixture_id, sport):
+                continue
+            near = self._near_date(fixture_id, local_date, team_window_days)
+            if near or (near is None and fixture_id in both_teams):
+                found.add(fixture_id)
+
+        source_gsl_id = to_gsl_id(source.get("id", ""), "fixture")
+        return sorted(
+            fixture_id
+            for fixture_id in found
+            if to_gsl_id(fixture_id, "fixture") != source_gsl_id
+        )
+
+    # --- Snapshot Persistence ---
+
+    def save_snapshot(self, path: str):
+        """Writes the indexed fixture records to a JSONL snapshot."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as outfile:
+            for record in self._fixtures.values():
+                outfile.write(json.dumps(record) + "\n")
+        print(f"Saved {len(self)} fixtures to index snapshot '{path}'.")
+
+    @classmethod
+    def load_snapshot(cls, path: str) -> "FixtureIndex":
+        index = cls()
+        with open(path, "r", encoding="utf-8") as infile:
+            index.add_many(json.loads(line) for line in infile if line.strip())
+        print(f"Loaded {len(index)} fixtures from index snapshot '{path}'.")
+        return index
+
+    @classmethod
+    def from_fixture_ids(cls, fixture_ids: List[str]) -> "FixtureIndex":
+        """Builds an index from bulk GraphQL pulls of the given fixture IDs."""
+        index = cls()
+        index.add_many(fetch_fixtures_by_ids(fixture_ids).values())
+        print(f"Indexed {len(index)} of {len(fixture_ids)} fixtures from GraphQL.")
+        return index
+
+
+# The index used by the `find_fixture_candidates` tool
+fixture_index: Optional[FixtureIndex] = None
+
+
+def load_fixture_index(path: str) -> FixtureIndex:
+    """Loads a snapshot as the index used by `find_fixture_candidates`."""
+    global fixture_index
+    fixture_index = FixtureIndex.load_snapshot(path)
+    return fixture_index
+
+
+# --- Tool: Find Fixture Candidates via the Index ---
+class FindFixtureCandidatesInput(BaseModel):
+    source_fixture_id: str = Field(description="The ID of the source fixture")
+
+
+def _index_lookup_ids(
+    source_fixture_id: str, hydrated_source: Dict[str, Dict[str, Any]]
+) -> List[str]:
+    source = hydrated_source[source_fixture_id]
+    if "error" in source:
+        print(f"Could not fetch source fixture: {source['error']}")
+        return []
+    if fixture_index is None:
+        print("No fixture index is loaded.")
+        return []
+    return fixture_index.candidates(source)
+
+
+def _find_fixture_candidates(source_fixture_id: str) -> Dict[str, Any]:
+    """Finds fixtures that could match the source fixture (compatible sport, and a localDate within one day or a shared home/away team) and returns the full details of those that pass the Step 1 sport pre-screen. No search term is needed."""
+    hydrated = fetch_fixtures_by_ids([source_fixture_id])
+    candidate_ids = _index_lookup_ids(source_fixture_id, hydrated)
+    hydrated.update(fetch_fixtures_by_ids(candidate_ids))
+    return screen_candidates(source_fixture_id, hydrated, "fixture")
+
+
+async def _afind_fixture_candidates(source_fixture_id: str) -> Dict[str, Any]:
+    hydrated = await afetch_fixtures_by_ids([source_fixture_id])
+    candidate_ids = _index_lookup_ids(source_fixture_id, hydrated)
+    hydrated.update(await afetch_fixtures_by_ids(candidate_ids))
+    return screen_candidates(source_fixture_id, hydrated, "fixture")
+
+
+find_fixture_candidates = tool_with_coroutine(
+    _find_fixture_candidates,
+    _afind_fixture_candidates,
+    FindFixtureCandidatesInput,
+    lambda screened: serialize_screened_candidates(screened, "fixture"),
+)
+
+
+if __name__ == "__main__":
+    from data_sources import fetch_ids_from_csv, fetch_ids_from_postgres
+
+    parser = argparse.ArgumentParser(
+        description="Build a fixture index snapshot from bulk GraphQL pulls."
+    )
+    parser.add_argument(
+        "data_source",
+        type=str,
+        choices=["csv", "postgres"],
+        help="Where to read the fixture IDs to index from.",
+    )
+    parser.add_argument(
+        "source_input",
+        type=str,
+        help="File path for CSV or table name for Postgres.",
+    )
+    parser.add_argument(
+        "snapshot_path",
+        type=str,
+        help="File path for the JSONL index snapshot.",
+    )
+    args = parser.parse_args()
+
+    if args.data_source == "csv":
+        ids = fetch_ids_from_csv(args.source_input)
+    else:
+        ids = fetch_ids_from_postgres(args.source_input, None)
+
+    FixtureIndex.from_fixture_ids(ids).save_snapshot(args.snapshot_path)
@@ -0,0 +1,90 @@
+import asyncio
+import importlib.util
+import os
+import threading
+import weakref
+from typing import Awaitable, Optional, TypeVar
+
+import httpx
+
+# Connection Pool Settings
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "30"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "10"))
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "true").lower() == "true"
+
+_client: Optional[httpx.Client] = None
+_client_lock = threading.Lock()
+# One async client per event loop
+_async_clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+T = TypeVar("T")
+
+
+def _client_options() -> dict:
+    # HTTP/2 needs the optional `h2` package; fall back to pooled HTTP/1.1 without it
+    http2 = HTTP2_ENABLED and importlib.util.find_spec("h2") is not None
+    return {
+        "http2": http2,
+        "timeout": httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+        "limits": httpx.Limits(
+            max_connections=HTTP_POOL_SIZE,
+            max_keepalive_connections=HTTP_POOL_SIZE,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+    }
+
+
+def get_client() -> httpx.Client:
+    """Returns the shared, pooled keep-alive client for synchronous calls."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = httpx.Client(**_client_options())
+    return _client
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """
+    Returns the shared, pooled keep-alive client for async calls. Async
+    connections belong to an event loop, so each loop gets its own client;
+    whoever runs the loop closes it with `aclose_async_client` (or
+    `aclose_clients`) before the loop ends.
+    """
+    loop = asyncio.get_running_loop()
+    with _client_lock:
+        client = _async_clients.get(loop)
+        if client is None:
+            client = _async_clients[loop] = httpx.AsyncClient(**_client_options())
+    return client
+
+
+async def aclose_async_client():
+    """Closes the current event loop's async client, if it has one."""
+    with _client_lock:
+        client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+async def aclose_clients():
+    """Closes the shared clients, e.g. on server shutdown."""
+    global _client
+    await aclose_async_client()
+    if _client is not None:
+        _client.close()
+        _client = None
+
+
+def run_closing_client(awaitable: Awaitable[T]) -> T:
+    """`asyncio.run` that closes the new loop's async client before the loop ends."""
+
+    async def run() -> T:
+        try:
+            return await awaitable
+        finally:
+            await aclose_async_client()
+
+    return asyncio.run(run())
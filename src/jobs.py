@@ -0,0 +1,160 @@
+import asyncio
+import math
+import os
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+# Job Queue Settings
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "100"))
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_RETENTION_SECONDS = float(os.getenv("JOB_RETENTION_SECONDS", "3600"))
+# Retry-After used before any job has finished
+JOB_DEFAULT_RETRY_AFTER = 30
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_COMPLETED = "completed"
+STATUS_FAILED = "failed"
+
+
+class JobQueueFull(Exception):
+    """Raised when a job is submitted while the queue is at capacity."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Job queue is full; retry after {retry_after}s.")
+        self.retry_after = retry_after
+
+
+class Job:
+    def __init__(self, entity_type: str, scoring_method: str, source_gsl_id: str):
+        self.job_id = uuid.uuid4().hex
+        self.entity_type = entity_type
+        self.scoring_method = scoring_method
+        self.source_gsl_id = source_gsl_id
+        self.status = STATUS_QUEUED
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "entity_type": self.entity_type,
+            "scoring_method": self.scoring_method,
+            "source_gsl_id": self.source_gsl_id,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+# --- Bounded Job Queue with a Fixed Worker Pool ---
+class JobManager:
+    """
+    Runs match jobs on a fixed pool of `workers` coroutines fed by a queue of
+    at most `max_queued` jobs. When the queue is full, submissions are
+    rejected right away instead of piling more load onto Bedrock.
+    """
+
+    def __init__(
+        self,
+        runner: Callable[[Job], Awaitable[Dict[str, Any]]],
+        max_queued: int = JOB_QUEUE_SIZE,
+        workers: int = JOB_WORKERS,
+        retention_seconds: float = JOB_RETENTION_SECONDS,
+    ):
+        self.runner = runner
+        self.max_queued = max_queued
+        self.worker_count = max(workers, 1)
+        self.retention_seconds = retention_seconds
+        self.jobs: Dict[str, Job] = {}
+        self.rejected = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._durations: List[float] = []
+
+    async def start(self):
+        # The queue belongs to the server's event loop, so it is created here
+        self._queue = asyncio.Queue(maxsize=self.max_queued)
+        self._workers = [
+            asyncio.create_task(self._work()) for _ in range(self.worker_count)
+        ]
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def _work(self):
+        while True:
+            job = await self._queue.get()
+            job.status = STATUS_RUNNING
+            job.started_at = time.time()
+            try:
+                job.result = await self.runner(job)
+                job.status = STATUS_COMPLETED
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                job.error = str(e)
+                job.status = STATUS_FAILED
+            finally:
+                job.finished_at = time.time()
+                self._durations = (
+                    self._durations + [job.finished_at - job.started_at]
+                )[-100:]
+                self._queue.task_done()
+
+    def _prune(self):
+        cutoff = time.time() - self.retention_seconds
+        for job_id in [
+            job_id
+            for job_id, job in self.jobs.items()
+            if job.finished_at is not None and job.finished_at < cutoff
+        ]:
+            del self.jobs[job_id]
+
+    def retry_after(self) -> int:
+        """Estimates when a queue slot frees up from recent job durations."""
+        if not self._durations:
+            return JOB_DEFAULT_RETRY_AFTER
+        average = sum(self._durations) / len(self._durations)
+        return max(1, math.ceil(average / self.worker_count))
+
+    def submit(self, entity_type: str, scoring_method: str, source_gsl_id: str) -> Job:
+        """Queues a job, or raises JobQueueFull if there is no room."""
+        self._prune()
+        job = Job(entity_type, scoring_method, source_gsl_id)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise JobQueueFull(self.retry_after())
+        self.jobs[job.job_id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    def stats(self) -> Dict[str, Any]:
+        counts = {
+            STATUS_QUEUED: 0,
+            STATUS_RUNNING: 0,
+            STATUS_COMPLETED: 0,
+            STATUS_FAILED: 0,
+        }
+        for job in self.jobs.values():
+            counts[job.status] += 1
+        return {
+            **counts,
+            "capacity": self.max_queued,
+            "workers": self.worker_count,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,84 @@
+import csv
+import json
+import os
+import time
+from typing import Any, Dict, List, Set
+
+STATUS_COMPLETED = "completed"
+STATUS_ERROR = "error"
+
+
+def journal_path_for(output_file: str) -> str:
+    """Returns the progress journal path that accompanies an output CSV."""
+    return f"{output_file}.journal.jsonl"
+
+
+# --- Append-only Progress Journal ---
+class ProgressJournal:
+    """
+    Append-only JSONL log of per-ID results. Every record is flushed and fsynced
+    as soon as it is written, so a crashed run loses at most the IDs in flight.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """Returns the latest journal record per source_gsl_id, in first-seen order."""
+        records: Dict[str, Dict[str, Any]] = {}
+        if not os.path.exists(self.path):
+            return records
+
+        with open(self.path, "r", encoding="utf-8") as infile:
+            for line in infile:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn final line from a crash mid-write; ignore it.
+                    print(f"Skipping unreadable journal line in '{self.path}'.")
+                    continue
+                records[record["source_gsl_id"]] = record
+        return records
+
+    def completed_ids(self) -> Set[str]:
+        """Returns the IDs whose latest record completed without a processing error."""
+        return {
+            source_id
+            for source_id, record in self.load().items()
+            if record.get("status") == STATUS_COMPLETED
+        }
+
+    def open(self, resume: bool = False):
+        """Opens the journal for appending; a fresh run truncates any old journal."""
+        self._file = open(self.path, "a" if resume else "w", encoding="utf-8")
+
+    def append(self, result: Dict[str, Any]):
+        """Writes one result to the journal and forces it to disk."""
+        status = (
+            STATUS_ERROR
+            if result.get("best_match_gsl_id") == "processing error"
+            else STATUS_COMPLETED
+        )
+        record = {**result, "status": status, "recorded_at": time.time()}
+        self._file.write(json.dumps(record, default=str) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def write_csv(self, output_file: str, fields: List[str]):
+        """Rewrites the output CSV with exactly one row per ID from the journal."""
+        records = self.load()
+        with open(output_file, mode="w", newline="", encoding="utf-8") as outfile:
+            writer = csv.writer(outfile)
+            writer.writerow(fields)
+            for record in records.values():
+                writer.writerow([record.get(field, "") for field in fields])
+        print(f"Compacted {len(records)} journal records into '{output_file}'.")
@@ -1,18 +1,98 @@
 import argparse
-from er_agent import create_entity_matching_agent, run_batch_process
-from sys_prompts import get_entity_matching_system_prompt
-from data_sources import fetch_ids_from_csv, fetch_ids_from_postgres
-from tools import get_agent_tools, add_multiple_numbers
+import sys
+from typing import AsyncIterator, Dict, Iterable, Iterator, Tuple
+
+from er_agent import (
+    aiter_source_ids,
+    build_agent,
+    run_batch_process,
+    RESULT_FIELDS,
+    TIER_AMBIGUITY_BAND,
+)
+from data_sources import (
+    iter_ids_from_csv,
+    iter_ids_from_postgres,
+    close_pool,
+    POSTGRES_MODES,
+)
+from tools import awarm_entity_cache, HYDRATION_CHUNK_SIZE
+from cache import CACHE_MODES, entity_cache, search_cache
+from decision_cache import decision_cache
+from prompt_cache import BEDROCK_PROMPT_CACHE
+from model_routing import route_stats
+from rate_limit import rate_limit_stats
+from sharding import Shard, parse_shard, shard_output_path
+from work_queue import WorkQueue, format_queue_stats, run_worker_pool
 
 # --- Configuration ---
 
 # 1. Toolset Definitions
 DATA_RETRIEVER = {
-    "csv": [fetch_ids_from_csv],
-    "postgres": [fetch_ids_from_postgres],
+    "csv": [iter_ids_from_csv],
+    "postgres": [iter_ids_from_postgres],
 }
 
 
+async def _warm_as_streamed(
+    entity_type: str, source_ids: Iterable[str]
+) -> AsyncIterator[str]:
+    """
+    Warms the entity cache one hydration chunk ahead of the batch, so streamed
+    IDs never have to be materialized up front. Runs inside the batch's event
+    loop: chunks are fetched with async GraphQL calls and the source is read
+    in a worker thread.
+    """
+    source_iter = aiter_source_ids(source_ids)
+    warmed = 0
+    while True:
+        chunk = []
+        async for source_id in source_iter:
+            chunk.append(source_id)
+            if len(chunk) == HYDRATION_CHUNK_SIZE:
+                break
+        if not chunk:
+            break
+        warmed += await awarm_entity_cache(entity_type, chunk)
+        for source_id in chunk:
+            yield source_id
+    print(f"Warmed entity cache with {warmed} source entities.")
+
+
+def _parse_filter(value: str) -> Tuple[str, str]:
+    """Parses a `column=value` --where argument."""
+    column, sep, expected = value.partition("=")
+    if not sep or not column.strip():
+        raise argparse.ArgumentTypeError(f"expected column=value, got '{value}'")
+    return column.strip(), expected.strip()
+
+
+def open_source_ids(
+    data_source: str,
+    source_input: str,
+    limit: int = None,
+    offset: int = 0,
+    pg_mode: str = "sequential",
+    filters: Dict[str, str] = None,
+    sample_percent: float = 1.0,
+    seed: int = None,
+    shard: Shard = None,
+) -> Iterator[str]:
+    """Returns a lazy stream of source IDs from the CSV or Postgres source."""
+    if data_source == "csv":
+        return iter_ids_from_csv(source_input, limit, offset, shard=shard)
+    print(f"Postgres Mode: {pg_mode}")
+    return iter_ids_from_postgres(
+        source_input,
+        limit,
+        offset,
+        mode=pg_mode,
+        filters=filters,
+        sample_percent=sample_percent,
+        seed=seed,
+        shard=shard,
+    )
+
+
 # --- Main Orchestration Logic ---
 
 
@@ -22,6 +102,20 @@ def main(
     source_input: str,
     scoring_method: str,
     output_path: str,
+    concurrency: int = 1,
+    preserve_order: bool = False,
+    resume: bool = False,
+    cache_mode: str = "use",
+    fixture_index_path: str = None,
+    limit: int = None,
+    offset: int = 0,
+    pg_mode: str = "sequential",
+    filters: Dict[str, str] = None,
+    sample_percent: float = 1.0,
+    seed: int = None,
+    shard: Shard = None,
+    prompt_cache: bool = BEDROCK_PROMPT_CACHE,
+    ambiguity_band: float = None,
 ):
     """
     Orchestrates a chain of agents to perform entity resolution.
@@ -31,29 +125,268 @@ def main(
     print(f"Entity Type: {entity_type}")
     print(f"Data Source: {data_source}")
     print(f"Scoring Method: {scoring_method}")
+    print(f"Concurrency: {concurrency}")
+    if ambiguity_band is not None:
+        print(
+            f"Tiered Matching: escalating scores within {ambiguity_band} of the threshold"
+        )
+    if shard:
+        # Each shard writes (and journals) its own output file
+        output_path = shard_output_path(output_path, shard)
+        print(f"Shard: {shard[0]}/{shard[1]} -> {output_path}")
 
-    if data_source == "csv":
-        source_ids = fetch_ids_from_csv(source_input, 100)
-    elif data_source == "postgres":
-        source_ids = fetch_ids_from_postgres(source_input, 100)
-
-    data_tools = [
-        *get_agent_tools(entity_type.to_lower()),
-        add_multiple_numbers,
-    ]
-    if not data_tools:
-        print(f"Error: Invalid entity type '{entity_type}'.")
+    # IDs are streamed lazily; matching starts as soon as the first ones arrive
+    source_ids = open_source_ids(
+        data_source,
+        source_input,
+        limit,
+        offset,
+        pg_mode,
+        filters,
+        sample_percent,
+        seed,
+        shard,
+    )
+
+    if cache_mode == "bypass":
+        entity_cache.enabled = False
+        search_cache.enabled = False
+        decision_cache.enabled = False
+    elif cache_mode == "invalidate":
+        entity_cache.invalidate(entity_type.lower())
+        decision_cache.invalidate(entity_type.lower())
+        print(f"Invalidated cached {entity_type} entities and decisions.")
+    elif cache_mode == "warm":
+        source_ids = _warm_as_streamed(entity_type, source_ids)
+
+    agent = build_agent(
+        entity_type, scoring_method, fixture_index_path, prompt_cache, ambiguity_band
+    )
+    if agent is None:
         return
 
-    agent_prompt = get_entity_matching_system_prompt(
-        scoring_method="weighted", entity_type=entity_type.to_lower()
+    try:
+        run_batch_process(
+            agent,
+            source_ids,
+            output_path,
+            concurrency=concurrency,
+            preserve_order=preserve_order,
+            resume=resume,
+        )
+    finally:
+        if data_source == "postgres":
+            close_pool()
+    print(f"Entity cache stats: {entity_cache.stats()}")
+    print(f"Search cache stats: {search_cache.stats()}")
+    print(f"Decision cache stats: {decision_cache.stats()}")
+    print(f"Prompt token usage: {agent.prompt_usage.stats()}")
+    print(f"Model routing: {route_stats.stats()}")
+    print(f"Rate limits: {rate_limit_stats()}")
+
+
+# --- Work Queue Commands ---
+
+
+def enqueue(queue_path: str, data_source: str, source_input: str, **source_options):
+    """Streams source IDs into the work queue; IDs already queued are skipped."""
+    queue = WorkQueue(queue_path)
+    try:
+        added = queue.enqueue(
+            open_source_ids(data_source, source_input, **source_options)
+        )
+    finally:
+        if data_source == "postgres":
+            close_pool()
+    print(f"Enqueued {added} new IDs into '{queue_path}'.")
+    print(format_queue_stats(queue.stats()))
+
+
+def queue_status(queue_path: str, export_path: str = None):
+    """Prints queue depth, lease ages and per-worker throughput."""
+    queue = WorkQueue(queue_path)
+    print(format_queue_stats(queue.stats()))
+    if export_path:
+        queue.write_csv(export_path, RESULT_FIELDS)
+
+
+def _add_source_arguments(parser: argparse.ArgumentParser):
+    """Adds the options that select which source IDs are read."""
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=None,
+        help="Maximum number of source IDs to process (default: all).",
+    )
+    parser.add_argument(
+        "--offset",
+        type=int,
+        default=0,
+        help="Number of source IDs to skip before processing starts.",
+    )
+    parser.add_argument(
+        "--pg_mode",
+        type=str,
+        choices=POSTGRES_MODES,
+        default="sequential",
+        help="Postgres retrieval: keyset-paginated id order, or a SYSTEM/BERNOULLI TABLESAMPLE.",
+    )
+    parser.add_argument(
+        "--sample_percent",
+        type=float,
+        default=1.0,
+        help="Percentage of the table to sample in system/bernoulli mode.",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Seed for a reproducible TABLESAMPLE subset.",
+    )
+    parser.add_argument(
+        "--where",
+        type=_parse_filter,
+        action="append",
+        default=[],
+        help="Postgres column=value filter, e.g. --where sport=SOCCER. May be repeated.",
+    )
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        default=None,
+        help="Process only shard i of N (0-based, e.g. 0/4), partitioned by a stable hash of the source ID.",
     )
-    agent = create_entity_matching_agent(scoring_prompt=agent_prompt, tools=data_tools)
 
-    run_batch_process(agent, source_ids, output_path)
 
+QUEUE_COMMANDS = ["enqueue", "worker", "status"]
 
-if __name__ == "__main__":
+
+def _source_options(args: argparse.Namespace) -> Dict:
+    return {
+        "limit": args.limit,
+        "offset": args.offset,
+        "pg_mode": args.pg_mode,
+        "filters": dict(args.where),
+        "sample_percent": args.sample_percent,
+        "seed": args.seed,
+        "shard": args.shard,
+    }
+
+
+def queue_cli(argv):
+    """`enqueue`, `worker` and `status` commands for the durable work queue."""
+    parser = argparse.ArgumentParser(description="Work queue commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    enqueue_parser = subparsers.add_parser(
+        "enqueue", help="Add source IDs to a work queue."
+    )
+    enqueue_parser.add_argument(
+        "queue_path", type=str, help="Path of the SQLite work queue."
+    )
+    enqueue_parser.add_argument(
+        "data_source",
+        type=str,
+        choices=["csv", "postgres"],
+        help="The data source to use.",
+    )
+    enqueue_parser.add_argument(
+        "source_input",
+        type=str,
+        help="File path for CSV or table name for Postgres.",
+    )
+    _add_source_arguments(enqueue_parser)
+
+    worker_parser = subparsers.add_parser(
+        "worker", help="Run a pool of worker processes until the queue is drained."
+    )
+    worker_parser.add_argument(
+        "entity_type",
+        type=str,
+        choices=["team", "fixture"],
+        help="The type of entity to process.",
+    )
+    worker_parser.add_argument(
+        "queue_path", type=str, help="Path of the SQLite work queue."
+    )
+    worker_parser.add_argument(
+        "--scoring_method",
+        type=str,
+        choices=["weighted", "binary", "weighted-native"],
+        default="weighted",
+        help="The scoring method to use for matching.",
+    )
+    worker_parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes.",
+    )
+    worker_parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="Maximum number of leased IDs each worker processes in parallel.",
+    )
+    worker_parser.add_argument(
+        "--fixture_index",
+        type=str,
+        default=None,
+        help="Path to a fixture index snapshot for fixture candidate lookups.",
+    )
+    worker_parser.add_argument(
+        "--prompt_cache",
+        action=argparse.BooleanOptionalAction,
+        default=BEDROCK_PROMPT_CACHE,
+        help="Cache the system prompt and source entity prefix with Bedrock prompt caching.",
+    )
+    worker_parser.add_argument(
+        "--ambiguity_band",
+        type=float,
+        nargs="?",
+        const=TIER_AMBIGUITY_BAND,
+        default=None,
+        help="Tiered matching: answer clear matches/non-matches with the native rubric and only send scores within this distance of the threshold to the LLM (default band: %(const)s).",
+    )
+
+    status_parser = subparsers.add_parser(
+        "status", help="Show queue depth, lease ages and per-worker throughput."
+    )
+    status_parser.add_argument(
+        "queue_path", type=str, help="Path of the SQLite work queue."
+    )
+    status_parser.add_argument(
+        "--export",
+        type=str,
+        default=None,
+        help="Also write every finished result to this CSV.",
+    )
+
+    args = parser.parse_args(argv)
+    if args.command == "enqueue":
+        enqueue(
+            args.queue_path,
+            args.data_source,
+            args.source_input,
+            **_source_options(args),
+        )
+    elif args.command == "worker":
+        run_worker_pool(
+            args.queue_path,
+            args.entity_type,
+            args.scoring_method,
+            args.workers,
+            args.concurrency,
+            args.fixture_index,
+            args.prompt_cache,
+            args.ambiguity_band,
+        )
+    else:
+        queue_status(args.queue_path, args.export)
+
+
+def batch_cli(argv):
+    """The one-shot batch command: read source IDs, match them, write a CSV."""
     parser = argparse.ArgumentParser(
         description="Autonomous Entity Resolution Agent Chain"
     )
@@ -77,7 +410,7 @@ if __name__ == "__main__":
     parser.add_argument(
         "--scoring_method",
         type=str,
-        choices=["weighted", "binary"],
+        choices=["weighted", "binary", "weighted-native"],
         default="weighted",
         help="The scoring method to use for matching.",
     )
@@ -86,7 +419,51 @@ if __name__ == "__main__":
         type=str,
         help="File path for CSV for output results.",
     )
-    args = parser.parse_args()
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="Maximum number of source IDs processed in parallel.",
+    )
+    parser.add_argument(
+        "--preserve_order",
+        action="store_true",
+        help="Write output rows in input order instead of completion order.",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip IDs already completed in the output's progress journal and retry failed ones.",
+    )
+    parser.add_argument(
+        "--cache",
+        type=str,
+        choices=CACHE_MODES,
+        default="use",
+        help="Entity and decision cache mode: use them, bypass them, warm the entity cache with the source IDs first, or invalidate both first.",
+    )
+    parser.add_argument(
+        "--fixture_index",
+        type=str,
+        default=None,
+        help="Path to a fixture index snapshot; fixture candidates then come from date/team index lookups instead of text search.",
+    )
+    parser.add_argument(
+        "--prompt_cache",
+        action=argparse.BooleanOptionalAction,
+        default=BEDROCK_PROMPT_CACHE,
+        help="Cache the system prompt and source entity prefix with Bedrock prompt caching.",
+    )
+    parser.add_argument(
+        "--ambiguity_band",
+        type=float,
+        nargs="?",
+        const=TIER_AMBIGUITY_BAND,
+        default=None,
+        help="Tiered matching: answer clear matches/non-matches with the native rubric and only send scores within this distance of the threshold to the LLM (default band: %(const)s).",
+    )
+    _add_source_arguments(parser)
+    args = parser.parse_args(argv)
 
     main(
         args.entity_type,
@@ -94,4 +471,19 @@ if __name__ == "__main__":
         args.source_input,
         args.scoring_method,
         args.output_path,
+        args.concurrency,
+        args.preserve_order,
+        args.resume,
+        args.cache,
+        args.fixture_index,
+        prompt_cache=args.prompt_cache,
+        ambiguity_band=args.ambiguity_band,
+        **_source_options(args),
     )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] in QUEUE_COMMANDS:
+        queue_cli(sys.argv[1:])
+    else:
+        batch_cli(sys.argv[1:])
@@ -0,0 +1,236 @@
+import asyncio
+import os
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.prompt_values import PromptValue
+from langchain_core.runnables import Runnable, RunnableConfig, RunnableLambda
+from pydantic import BaseModel, ValidationError
+
+from rate_limit import bedrock_governor, is_retryable_bedrock_error
+
+# Model Routing Settings
+BEDROCK_FAST_MODEL_ID = os.getenv("BEDROCK_FAST_MODEL_ID", "")
+BEDROCK_FALLBACK_MODEL_ID = os.getenv("BEDROCK_FALLBACK_MODEL_ID", "")
+
+# Once one of these has returned, the agent is adjudicating candidates
+CANDIDATE_TOOL_NAMES = {
+    "find_screened_team_candidates",
+    "find_screened_fixture_candidates",
+    "find_fixture_candidates",
+}
+# Only the large model may end a run
+FINAL_TOOL_NAME = "submit_match"
+
+ROUTE_SEARCH = "search"
+ROUTE_ADJUDICATE = "adjudicate"
+ROUTE_ESCALATE = "escalate"
+ROUTE_FALLBACK = "fallback"
+
+
+def estimate_tokens(messages: List[BaseMessage]) -> int:
+    """A rough input token count (4 characters per token) for the token bucket."""
+    return sum(len(str(message.content)) for message in messages) // 4
+
+
+async def ainvoke_model(
+    model: Runnable,
+    messages: List[BaseMessage],
+    retries: Optional[int] = None,
+    config: Optional[RunnableConfig] = None,
+) -> AIMessage:
+    """
+    Calls a chat model through the shared Bedrock rate governor, then charges
+    the token bucket with the usage Bedrock reported. `config` carries the
+    parent run's callbacks, so the call is traced under the agent run.
+    """
+    estimate = estimate_tokens(messages)
+    message = await bedrock_governor.acall(
+        lambda: model.ainvoke(messages, config=config),
+        tokens=estimate,
+        retries=retries,
+    )
+    usage = message.usage_metadata or {}
+    bedrock_governor.charge(estimate, usage.get("total_tokens", estimate))
+    return message
+
+
+def governed(model: Runnable) -> RunnableLambda:
+    """Wraps a single chat model so each agent turn goes through `ainvoke_model`."""
+
+    async def acall(prompt: Any, config: RunnableConfig) -> AIMessage:
+        messages = (
+            prompt.to_messages() if isinstance(prompt, PromptValue) else list(prompt)
+        )
+        return await ainvoke_model(model, messages, config=config)
+
+    return RunnableLambda(
+        lambda prompt, config: asyncio.run(acall(prompt, config)),
+        afunc=acall,
+        name="GovernedModel",
+    )
+
+
+# --- Route and Per-Model Statistics ---
+class RouteStats:
+    """Counts route decisions and totals latency and tokens per model ID."""
+
+    def __init__(self):
+        self.routes = Counter()
+        self.models: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def record_route(self, route: str):
+        with self._lock:
+            self.routes[route] += 1
+
+    def record_call(
+        self, model_id: str, seconds: float, message: Optional[AIMessage] = None
+    ):
+        usage = (message.usage_metadata if message is not None else None) or {}
+        with self._lock:
+            model = self.models.setdefault(
+                model_id,
+                {
+                    "calls": 0,
+                    "errors": 0,
+                    "latency_s": 0.0,
+                    "input_tokens": 0,
+                    "output_tokens": 0,
+                },
+            )
+            model["calls"] += 1
+            model["errors"] += message is None
+            model["latency_s"] += seconds
+            model["input_tokens"] += usage.get("input_tokens", 0)
+            model["output_tokens"] += usage.get("output_tokens", 0)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "routes": dict(self.routes),
+                "models": {
+                    model_id: {
+                        **model,
+                        "latency_s": round(model["latency_s"], 3),
+                        "avg_latency_s": round(model["latency_s"] / model["calls"], 3),
+                    }
+                    for model_id, model in self.models.items()
+                },
+            }
+
+
+route_stats = RouteStats()
+
+
+# --- Model Router ---
+class ModelRouter:
+    """
+    Picks the chat model for each agent turn. Turns before any candidate
+    search has returned go to the fast model; adjudicating candidates goes to
+    the large model. A fast-model turn that tries to end the run, calls an
+    unknown tool or passes arguments its tool rejects is rerun on the large
+    model. A throttled or transiently failing call is retried on the
+    fallback model.
+    """
+
+    def __init__(
+        self,
+        models: Dict[str, BaseChatModel],
+        tools: Sequence[Any],
+        large_model_id: str,
+        fast_model_id: Optional[str] = None,
+        fallback_model_id: Optional[str] = None,
+        stats: RouteStats = route_stats,
+    ):
+        self.bound = {
+            model_id: model.bind_tools(tools) for model_id, model in models.items()
+        }
+        self.tools = {tool.name: tool for tool in tools}
+        self.large_model_id = large_model_id
+        self.fast_model_id = fast_model_id
+        self.fallback_model_id = fallback_model_id
+        self.stats = stats
+
+    def as_runnable(self) -> RunnableLambda:
+        return RunnableLambda(self.invoke, afunc=self.ainvoke, name="ModelRouter")
+
+    @staticmethod
+    def _is_adjudicating(messages: List[BaseMessage]) -> bool:
+        return any(
+            call["name"] in CANDIDATE_TOOL_NAMES
+            for message in messages
+            if isinstance(message, AIMessage)
+            for call in message.tool_calls
+        )
+
+    def _rejection(self, message: AIMessage) -> Optional[str]:
+        """Why a fast-model turn must be redone by the large model, if it must."""
+        if message.invalid_tool_calls:
+            return "malformed tool call"
+        if not message.tool_calls:
+            return "answered without a tool call"
+        for call in message.tool_calls:
+            if call["name"] == FINAL_TOOL_NAME:
+                return "attempted the final answer"
+            tool = self.tools.get(call["name"])
+            if tool is None:
+                return f"called unknown tool '{call['name']}'"
+            schema = tool.args_schema
+            if isinstance(schema, type) and issubclass(schema, BaseModel):
+                try:
+                    schema.model_validate(call["args"])
+                except ValidationError:
+                    return f"invalid arguments for '{call['name']}'"
+        return None
+
+    async def _acall(
+        self,
+        model_id: str,
+        messages: List[BaseMessage],
+        config: Optional[RunnableConfig] = None,
+    ) -> AIMessage:
+        started = time.perf_counter()
+        # With a fallback model, a throttled or failing call moves there instead
+        # of being retried
+        retries = 0 if self.fallback_model_id else None
+        try:
+            message = await ainvoke_model(
+                self.bound[model_id], messages, retries, config
+            )
+        except Exception as e:
+            self.stats.record_call(model_id, time.perf_counter() - started)
+            if not (self.fallback_model_id and is_retryable_bedrock_error(e)):
+                raise
+            self.stats.record_route(ROUTE_FALLBACK)
+            started = time.perf_counter()
+            message = await ainvoke_model(
+                self.bound[self.fallback_model_id], messages, config=config
+            )
+            model_id = self.fallback_model_id
+        self.stats.record_call(model_id, time.perf_counter() - started, message)
+        return message
+
+    async def ainvoke(
+        self, prompt: Any, config: Optional[RunnableConfig] = None
+    ) -> AIMessage:
+        messages = (
+            prompt.to_messages() if isinstance(prompt, PromptValue) else list(prompt)
+        )
+        if not self.fast_model_id or self._is_adjudicating(messages):
+            self.stats.record_route(ROUTE_ADJUDICATE)
+            return await self._acall(self.large_model_id, messages, config)
+
+        self.stats.record_route(ROUTE_SEARCH)
+        message = await self._acall(self.fast_model_id, messages, config)
+        if self._rejection(message) is None:
+            return message
+        self.stats.record_route(ROUTE_ESCALATE)
+        return await self._acall(self.large_model_id, messages, config)
+
+    def invoke(self, prompt: Any, config: Optional[RunnableConfig] = None) -> AIMessage:
+        return asyncio.run(self.ainvoke(prompt, config))
@@ -0,0 +1,226 @@
+import math
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import orjson
+
+# Upper bound on the estimated tokens a single tool call may return
+MAX_TOOL_OUTPUT_TOKENS = int(os.getenv("MAX_TOOL_OUTPUT_TOKENS", "4000"))
+# Rough characters-per-token ratio for compact JSON
+CHARS_PER_TOKEN = 4
+# Roster lists are not halved below this length while entities can be dropped
+MIN_ROSTER_VALUES = 8
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _dumps(payload: Any) -> str:
+    return orjson.dumps(payload).decode("utf-8")
+
+
+def _unique(values) -> List[Any]:
+    return list(dict.fromkeys(value for value in values if value not in (None, "")))
+
+
+# --- Team and Fixture Projections ---
+
+
+def _team_member_keys(team: Dict[str, Any]) -> Dict[str, List[str]]:
+    members = [member or {} for member in team.get("teamMembers") or []]
+    individuals = [member.get("individual") or {} for member in members]
+    return {
+        "individualIds": _unique(individual.get("id") for individual in individuals),
+        "fullNames": _unique(
+            (individual.get("commonName") or {}).get("fullName")
+            for individual in individuals
+        ),
+        "preferredJerseys": _unique(
+            member.get("preferredJersey") for member in members
+        ),
+    }
+
+
+def _fixture_participant_ids(fixture: Dict[str, Any]) -> List[str]:
+    individuals = (fixture.get("individuals") or {}).get("nodes") or []
+    rosters = (fixture.get("fixtureRosters") or {}).get("nodes") or []
+    return _unique(
+        [(node or {}).get("id") for node in individuals]
+        + [(node or {}).get("individualId") for node in rosters]
+    )
+
+
+def _shared(values: List[Any], source_values: List[Any]) -> List[Any]:
+    source_set = set(source_values)
+    return [value for value in values if value in source_set]
+
+
+def project_team(
+    team: Dict[str, Any], source: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Keeps only the fields the team audit rules read. Rosters become ID/name
+    lists; for a candidate (when `source` is given) only the values shared with
+    the source are kept, which is all the overlap checks need.
+    """
+    if "error" in team:
+        return team
+
+    members = _team_member_keys(team)
+    if source is not None:
+        source_members = _team_member_keys(source)
+        members = {
+            f"shared{key[0].upper()}{key[1:]}": _shared(values, source_members[key])
+            for key, values in members.items()
+        }
+    members["count"] = len(team.get("teamMembers") or [])
+
+    return {
+        "id": team.get("id"),
+        "name": team.get("name"),
+        "sport": team.get("sport"),
+        "gender": team.get("gender"),
+        "regionName": team.get("regionName"),
+        "teamType": team.get("teamType"),
+        "competitions": [
+            {"id": c.get("id"), "name": c.get("name")}
+            for c in team.get("competitions") or []
+            if c
+        ],
+        "teamMembers": members,
+    }
+
+
+def project_fixture(
+    fixture: Dict[str, Any], source: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Keeps only the fields the fixture audit rule reads. Individuals and roster
+    nodes become one participant ID list; for a candidate only the IDs shared
+    with the source are kept.
+    """
+    if "error" in fixture:
+        return fixture
+
+    participant_ids = _fixture_participant_ids(fixture)
+    if source is not None:
+        participants = {
+            "sharedIndividualIds": _shared(
+                participant_ids, _fixture_participant_ids(source)
+            )
+        }
+    else:
+        participants = {"individualIds": participant_ids}
+    participants["count"] = len(participant_ids)
+
+    return {
+        "id": fixture.get("id"),
+        "localDate": fixture.get("localDate"),
+        "sport": fixture.get("sport"),
+        "competitionName": fixture.get("competitionName"),
+        "homeTeam": fixture.get("homeTeam"),
+        "awayTeam": fixture.get("awayTeam"),
+        "result": fixture.get("result"),
+        "participants": participants,
+    }
+
+
+def project_entity(
+    entity: Dict[str, Any], entity_type: str, source: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    if entity_type == "team":
+        return project_team(entity, source)
+    return project_fixture(entity, source)
+
+
+# --- Token Budget ---
+
+
+def _roster_lists(entities: List[Dict[str, Any]]) -> List[tuple]:
+    """Returns (container, key) for every roster list in the projected entities."""
+    lists = []
+    for entity in entities:
+        for field in ("teamMembers", "participants"):
+            container = entity.get(field)
+            if isinstance(container, dict):
+                lists.extend(
+                    (container, key)
+                    for key, value in container.items()
+                    if isinstance(value, list)
+                )
+    return lists
+
+
+def fit_to_budget(
+    entities: List[Dict[str, Any]], budget: int = MAX_TOOL_OUTPUT_TOKENS
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Trims the serialized entities to `budget` tokens. The longest roster list
+    is halved (recording how many values were dropped) down to
+    MIN_ROSTER_VALUES; after that, entities are dropped from the end of the
+    list, which is ordered by search relevance. A single remaining entity has
+    its rosters halved further. Returns the kept entities and the number dropped.
+    """
+    entities = list(entities)
+    dropped = 0
+    while estimate_tokens(_dumps(entities)) > budget:
+        lists = [(c, k) for c, k in _roster_lists(entities) if len(c[k]) > 1]
+        longest = max(lists, key=lambda item: len(item[0][item[1]]), default=None)
+        if longest and (
+            len(longest[0][longest[1]]) > MIN_ROSTER_VALUES or len(entities) == 1
+        ):
+            container, key = longest
+            values = container[key]
+            keep = len(values) // 2
+            container[key] = values[:keep]
+            truncated_key = f"{key}Truncated"
+            container[truncated_key] = (
+                container.get(truncated_key, 0) + len(values) - keep
+            )
+        elif len(entities) > 1:
+            entities.pop()
+            dropped += 1
+        else:
+            # One entity without rosters left to trim: nothing more can go
+            break
+    return entities, dropped
+
+
+# --- Tool Output Serializers ---
+
+
+def serialize_entity(entity: Dict[str, Any], entity_type: str) -> str:
+    """Compact JSON for a single fetched entity."""
+    return _dumps(fit_to_budget([project_entity(entity, entity_type)])[0][0])
+
+
+def serialize_entities(entities: List[Dict[str, Any]], entity_type: str) -> str:
+    """
+    Compact JSON for a list of fetched entities. If entities had to be dropped
+    to fit the budget, the list is wrapped with an `entities_truncated` count.
+    """
+    kept, dropped = fit_to_budget([project_entity(e, entity_type) for e in entities])
+    if dropped:
+        return _dumps({"entities": kept, "entities_truncated": dropped})
+    return _dumps(kept)
+
+
+def serialize_screened_candidates(screened: Dict[str, Any], entity_type: str) -> str:
+    """
+    Compact JSON for a pre-screened candidate list, with rosters reduced to
+    overlaps and `candidates_truncated` counting candidates over the budget.
+    """
+    if "error" in screened:
+        return _dumps(screened)
+    source = screened["source"]
+    candidates, dropped = fit_to_budget(
+        [project_entity(c, entity_type, source) for c in screened["candidates"]]
+    )
+    return _dumps(
+        {
+            "candidates": candidates,
+            "candidates_truncated": dropped,
+            "prescreen_disqualified": screened["prescreen_disqualified"],
+        }
+    )
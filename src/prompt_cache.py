@@ -0,0 +1,95 @@
+import os
+import threading
+from typing import Any, Dict, List
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+from langchain_core.outputs import LLMResult
+from langchain_core.prompt_values import PromptValue
+
+# Prompt Cache Settings
+BEDROCK_PROMPT_CACHE = os.getenv("BEDROCK_PROMPT_CACHE", "false").lower() == "true"
+
+# Bedrock Converse cache checkpoint; everything before it is cached as a prefix
+CACHE_POINT = {"cachePoint": {"type": "default"}}
+
+
+def _with_cache_point(message: BaseMessage) -> BaseMessage:
+    content = message.content
+    if isinstance(content, str):
+        content = [{"type": "text", "text": content}]
+    return message.model_copy(update={"content": [*content, CACHE_POINT]})
+
+
+def add_cache_points(prompt_value: PromptValue) -> List[BaseMessage]:
+    """
+    Adds two cache checkpoints to a formatted agent prompt: after the system
+    prompt, which is identical for every entity, and after the first round of
+    tool results (the source entity fetch), which every later turn of the same
+    entity repeats.
+    """
+    messages = prompt_value.to_messages()
+    if messages and messages[0].type == "system":
+        messages[0] = _with_cache_point(messages[0])
+
+    first_ai = next(
+        (i for i, message in enumerate(messages) if isinstance(message, AIMessage)),
+        None,
+    )
+    if first_ai is not None:
+        last_tool = first_ai
+        while last_tool + 1 < len(messages) and isinstance(
+            messages[last_tool + 1], ToolMessage
+        ):
+            last_tool += 1
+        # Only checkpoint once later turns exist to reuse the prefix
+        if last_tool != first_ai and last_tool + 1 < len(messages):
+            messages[last_tool] = _with_cache_point(messages[last_tool])
+    return messages
+
+
+# --- Token Usage Reporting ---
+class PromptCacheUsage(BaseCallbackHandler):
+    """
+    Totals token usage over model calls. Bedrock reports input tokens read from
+    and written to the prompt cache separately from the uncached input tokens.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.input_tokens = 0
+        self.cache_read_tokens = 0
+        self.cache_write_tokens = 0
+        self.output_tokens = 0
+        self._lock = threading.Lock()
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any):
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(
+                    getattr(generation, "message", None), "usage_metadata", None
+                )
+                if not usage:
+                    continue
+                details = usage.get("input_token_details") or {}
+                with self._lock:
+                    self.calls += 1
+                    self.input_tokens += usage.get("input_tokens", 0)
+                    self.cache_read_tokens += details.get("cache_read", 0)
+                    self.cache_write_tokens += details.get("cache_creation", 0)
+                    self.output_tokens += usage.get("output_tokens", 0)
+
+    def stats(self) -> Dict[str, Any]:
+        total_input = (
+            self.input_tokens + self.cache_read_tokens + self.cache_write_tokens
+        )
+        return {
+            "calls": self.calls,
+            "uncached_input_tokens": self.input_tokens,
+            "cache_read_tokens": self.cache_read_tokens,
+            "cache_write_tokens": self.cache_write_tokens,
+            "output_tokens": self.output_tokens,
+            "cached_ratio": (
+                round(self.cache_read_tokens / total_input, 3) if total_input else 0.0
+            ),
+        }
@@ -0,0 +1,451 @@
+import asyncio
+import contextvars
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+import httpx
+from botocore.exceptions import (
+    ClientError,
+    ConnectionClosedError,
+    ConnectTimeoutError,
+    EndpointConnectionError,
+    ReadTimeoutError,
+)
+
+# Rate Limit Settings (0 disables a limit)
+BEDROCK_RPM = float(os.getenv("BEDROCK_RPM", "0"))
+BEDROCK_TPM = float(os.getenv("BEDROCK_TPM", "0"))
+BEDROCK_MAX_CONCURRENCY = int(os.getenv("BEDROCK_MAX_CONCURRENCY", "50"))
+GRAPHQL_RPM = float(os.getenv("GRAPHQL_RPM", "0"))
+GRAPHQL_MAX_CONCURRENCY = int(
+    os.getenv("GRAPHQL_MAX_CONCURRENCY", os.getenv("HTTP_POOL_SIZE", "20"))
+)
+RATE_LIMIT_MAX_RETRIES = int(os.getenv("RATE_LIMIT_MAX_RETRIES", "6"))
+RATE_LIMIT_BASE_DELAY = float(os.getenv("RATE_LIMIT_BASE_DELAY", "1"))
+RATE_LIMIT_MAX_DELAY = float(os.getenv("RATE_LIMIT_MAX_DELAY", "30"))
+MATCH_DEADLINE_SECONDS = float(os.getenv("MATCH_DEADLINE_SECONDS", "600"))
+
+# Bedrock error codes that mean "slow down", and those worth another attempt
+THROTTLING_ERROR_CODES = {
+    "ThrottlingException",
+    "TooManyRequestsException",
+    "ServiceUnavailableException",
+}
+RETRYABLE_ERROR_CODES = THROTTLING_ERROR_CODES | {
+    "ModelNotReadyException",
+    "InternalServerException",
+}
+BOTOCORE_TRANSIENT_ERRORS = (
+    ConnectionClosedError,
+    ConnectTimeoutError,
+    EndpointConnectionError,
+    ReadTimeoutError,
+)
+THROTTLING_STATUS_CODES = {429, 503}
+RETRYABLE_STATUS_CODES = THROTTLING_STATUS_CODES | {502, 504}
+
+T = TypeVar("T")
+
+
+# --- Error Classification ---
+
+
+def _error_chain(error: Optional[BaseException]):
+    while error is not None:
+        yield error
+        error = error.__cause__ or error.__context__
+
+
+def _bedrock_error_code(error: BaseException) -> Optional[str]:
+    if isinstance(error, ClientError):
+        return error.response.get("Error", {}).get("Code")
+    # langchain_aws re-raises some ClientErrors as plain errors with the code in the text
+    return next((code for code in RETRYABLE_ERROR_CODES if code in str(error)), None)
+
+
+def is_throttling_error(error: BaseException) -> bool:
+    """True for Bedrock throttling, including errors re-raised by langchain_aws."""
+    return any(
+        _bedrock_error_code(e) in THROTTLING_ERROR_CODES for e in _error_chain(error)
+    )
+
+
+def is_retryable_bedrock_error(error: BaseException) -> bool:
+    return any(
+        isinstance(e, BOTOCORE_TRANSIENT_ERRORS)
+        or _bedrock_error_code(e) in RETRYABLE_ERROR_CODES
+        for e in _error_chain(error)
+    )
+
+
+def is_throttling_http_error(error: BaseException) -> bool:
+    """429/503 responses and timeouts: the GraphQL endpoint is overloaded."""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in THROTTLING_STATUS_CODES
+    return isinstance(error, httpx.TimeoutException)
+
+
+def is_retryable_http_error(error: BaseException) -> bool:
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in RETRYABLE_STATUS_CODES
+    return isinstance(error, (httpx.TimeoutException, httpx.TransportError))
+
+
+def retry_after_seconds(error: BaseException) -> float:
+    """The server's Retry-After hint in seconds, or 0 without one."""
+    if isinstance(error, httpx.HTTPStatusError):
+        try:
+            return float(error.response.headers.get("Retry-After", 0))
+        except ValueError:
+            return 0.0
+    return 0.0
+
+
+# --- Per-ID Deadline ---
+
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar(
+    "rate_limit_deadline", default=None
+)
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when one source ID runs past MATCH_DEADLINE_SECONDS."""
+
+
+@contextmanager
+def deadline_scope(seconds: float):
+    """
+    Sets the deadline retries must finish by for everything run in this
+    context, including tasks and executor threads started from it.
+    """
+    token = _deadline.set(time.monotonic() + seconds if seconds > 0 else None)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def time_remaining() -> Optional[float]:
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+async def with_deadline(awaitable: Awaitable[T], seconds: float) -> T:
+    """Awaits `awaitable` under a per-ID deadline; 0 means no deadline."""
+    with deadline_scope(seconds):
+        if seconds <= 0:
+            return await awaitable
+        try:
+            return await asyncio.wait_for(awaitable, seconds)
+        except asyncio.TimeoutError as e:
+            raise DeadlineExceeded(f"deadline of {seconds:g}s exceeded") from e
+
+
+# --- Token Bucket ---
+class TokenBucket:
+    """
+    A token bucket refilled at `per_minute` and holding up to one minute's worth.
+    Callers reserve what they need up front and wait out any deficit, so
+    concurrent callers queue fairly instead of retrying in a burst. The
+    balance can be corrected afterwards once the real cost is known.
+    """
+
+    def __init__(self, per_minute: float):
+        self.rate = per_minute / 60
+        self.capacity = per_minute
+        self.tokens = per_minute
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float = 1) -> float:
+        """Takes `amount` tokens and returns how long to wait before using them."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+            self.tokens -= min(amount, self.capacity)
+            return max(-self.tokens / self.rate, 0.0)
+
+    def adjust(self, amount: float):
+        """Charges (or refunds, if negative) the difference to an earlier estimate."""
+        with self._lock:
+            self.tokens = min(self.capacity, self.tokens - amount)
+
+
+def _check_not_on_event_loop(name: str):
+    """
+    Sync callers block until a slot frees up. On an event loop thread that
+    would stall the async callers holding the slots, so it is refused.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    raise RuntimeError(
+        f"{name} was called synchronously on a running event loop; "
+        "use the async variant or run it in a worker thread"
+    )
+
+
+# --- AIMD Concurrency Limit ---
+class AdaptiveConcurrency:
+    """
+    Limits calls in flight to an adaptive limit. Each success raises the limit
+    by 1/limit (about +1 per round of calls, up to `max_limit`); a throttle
+    halves it. Only calls started after the last decrease can decrease it
+    again, so one burst of concurrent throttles counts as a single signal.
+    Sync and async callers share it; sync callers must not run on an event
+    loop thread.
+    """
+
+    def __init__(
+        self,
+        max_limit: int,
+        min_limit: int = 1,
+        backoff: float = 0.5,
+    ):
+        self.max_limit = max(max_limit, 1)
+        self.min_limit = max(min(min_limit, self.max_limit), 1)
+        self.limit = float(self.max_limit)
+        self.backoff = backoff
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        self._waiters: deque = deque()
+        self._lock = threading.Lock()
+
+    def _try_enter(self) -> bool:
+        if self.in_flight < int(self.limit):
+            self.in_flight += 1
+            return True
+        return False
+
+    def _wake(self):
+        free = int(self.limit) - self.in_flight
+        while free > 0 and self._waiters:
+            self._waiters.popleft()()
+            free -= 1
+
+    def acquire(self):
+        _check_not_on_event_loop("AdaptiveConcurrency.acquire")
+        while True:
+            with self._lock:
+                if self._try_enter():
+                    return
+                event = threading.Event()
+                self._waiters.append(event.set)
+            event.wait()
+
+    async def aacquire(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._lock:
+                if self._try_enter():
+                    return
+                waiter = loop.create_future()
+
+                def wake(waiter=waiter):
+                    loop.call_soon_threadsafe(
+                        lambda: waiter.done() or waiter.set_result(None)
+                    )
+
+                self._waiters.append(wake)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                with self._lock:
+                    if wake in self._waiters:
+                        self._waiters.remove(wake)
+                    else:
+                        # Pass on the wake-up this waiter will not use
+                        self._wake()
+                raise
+
+    def release(self):
+        with self._lock:
+            self.in_flight -= 1
+            self._wake()
+
+    def on_success(self):
+        with self._lock:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self._wake()
+
+    def on_throttle(self, started: float):
+        """Handles a throttle of a call that started at `started` (monotonic)."""
+        with self._lock:
+            if started > self._last_decrease:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self._last_decrease = time.monotonic()
+
+
+# --- Rate Governor ---
+class RateGovernor:
+    """
+    Everything one upstream service gets called through: request and token
+    buckets for its per-minute quotas, an AIMD concurrency limit that finds
+    the throughput it sustains, and jittered exponential retries of transient
+    errors that never sleep past the current per-ID deadline.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        is_throttling: Callable[[BaseException], bool],
+        is_retryable: Callable[[BaseException], bool],
+        max_concurrency: int,
+        requests_per_minute: float = 0,
+        tokens_per_minute: float = 0,
+        max_retries: int = RATE_LIMIT_MAX_RETRIES,
+    ):
+        self.name = name
+        self.is_throttling = is_throttling
+        self.is_retryable = is_retryable
+        self.concurrency = AdaptiveConcurrency(max_concurrency)
+        self.requests = (
+            TokenBucket(requests_per_minute) if requests_per_minute else None
+        )
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.max_retries = max_retries
+        self.calls = 0
+        self.throttles = 0
+        self.retries = 0
+        self.failures = 0
+        self.wait_s = 0.0
+        # Sync calls come in from many threads
+        self._lock = threading.Lock()
+
+    def _backoff(
+        self, error: BaseException, started: float, attempt: int, retries: int
+    ) -> float:
+        """Seconds to sleep before retrying `error`; re-raises it if that is pointless."""
+        if self.is_throttling(error):
+            with self._lock:
+                self.throttles += 1
+            self.concurrency.on_throttle(started)
+        if attempt >= retries or not self.is_retryable(error):
+            with self._lock:
+                self.failures += 1
+            raise error
+        # Full jitter keeps throttled callers from retrying in lockstep
+        delay = random.uniform(
+            0, min(RATE_LIMIT_MAX_DELAY, RATE_LIMIT_BASE_DELAY * 2**attempt)
+        )
+        delay = max(delay, retry_after_seconds(error))
+        remaining = time_remaining()
+        if remaining is not None and delay >= remaining:
+            with self._lock:
+                self.failures += 1
+            raise error
+        with self._lock:
+            self.retries += 1
+        print(
+            f"[{self.name}] {type(error).__name__}; retry {attempt + 1}/{retries} in {delay:.1f}s"
+        )
+        return delay
+
+    def _reserve(self, tokens: float) -> float:
+        delay = self.requests.reserve() if self.requests else 0.0
+        if self.tokens and tokens:
+            delay = max(delay, self.tokens.reserve(tokens))
+        with self._lock:
+            self.wait_s += delay
+        return delay
+
+    def charge(self, estimated_tokens: float, used_tokens: float):
+        """Corrects the token bucket once a call reports its real usage."""
+        if self.tokens:
+            self.tokens.adjust(used_tokens - estimated_tokens)
+
+    def call(
+        self, fn: Callable[[], T], tokens: float = 0, retries: Optional[int] = None
+    ) -> T:
+        _check_not_on_event_loop(f"{self.name} governor call")
+        retries = self.max_retries if retries is None else retries
+        attempt = 0
+        while True:
+            delay = self._reserve(tokens)
+            if delay:
+                time.sleep(delay)
+            self.concurrency.acquire()
+            started = time.monotonic()
+            with self._lock:
+                self.calls += 1
+            try:
+                result = fn()
+            except Exception as e:
+                error = e
+            else:
+                self.concurrency.on_success()
+                return result
+            finally:
+                self.concurrency.release()
+            time.sleep(self._backoff(error, started, attempt, retries))
+            attempt += 1
+
+    async def acall(
+        self,
+        fn: Callable[[], Awaitable[T]],
+        tokens: float = 0,
+        retries: Optional[int] = None,
+    ) -> T:
+        retries = self.max_retries if retries is None else retries
+        attempt = 0
+        while True:
+            delay = self._reserve(tokens)
+            if delay:
+                await asyncio.sleep(delay)
+            await self.concurrency.aacquire()
+            started = time.monotonic()
+            with self._lock:
+                self.calls += 1
+            try:
+                result = await fn()
+            except Exception as e:
+                error = e
+            else:
+                self.concurrency.on_success()
+                return result
+            finally:
+                self.concurrency.release()
+            await asyncio.sleep(self._backoff(error, started, attempt, retries))
+            attempt += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "throttles": self.throttles,
+                "retries": self.retries,
+                "failures": self.failures,
+                "concurrency_limit": round(self.concurrency.limit, 1),
+                "in_flight": self.concurrency.in_flight,
+                "rate_wait_s": round(self.wait_s, 3),
+            }
+
+
+bedrock_governor = RateGovernor(
+    "bedrock",
+    is_throttling_error,
+    is_retryable_bedrock_error,
+    BEDROCK_MAX_CONCURRENCY,
+    requests_per_minute=BEDROCK_RPM,
+    tokens_per_minute=BEDROCK_TPM,
+)
+graphql_governor = RateGovernor(
+    "graphql",
+    is_throttling_http_error,
+    is_retryable_http_error,
+    GRAPHQL_MAX_CONCURRENCY,
+    requests_per_minute=GRAPHQL_RPM,
+)
+
+
+def rate_limit_stats() -> Dict[str, Any]:
+    return {"bedrock": bedrock_governor.stats(), "graphql": graphql_governor.stats()}
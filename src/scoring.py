@@ -0,0 +1,192 @@
+import json
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from final_answer import NO_MATCH
+
+# Minimum total score for a candidate to be reported as a match
+MATCH_THRESHOLD = 2
+
+# (label, points) per rule of TEAM_WEIGHTED_AUDIT_RULE, in justification order
+TEAM_WEIGHTED_RULES = [
+    ("Core Attributes Match (Rule 1)", 1.0),
+    ("Name Match (Rule 2)", 2.0),
+    ("Competition Overlap (Rule 3)", 0.5),
+    ("Team Member Overlap (Rule 4)", 0.5),
+    ("Region Match (Rule 5)", 0.5),
+    ("Team Type Match (Rule 6)", 0.5),
+]
+TEAM_RULE_POINTS = np.array([points for _, points in TEAM_WEIGHTED_RULES])
+
+# Fields whose explicit mismatch disqualifies a candidate in Step 1
+TEAM_PRESCREEN_FIELDS = ("sport", "gender")
+FIXTURE_PRESCREEN_FIELDS = ("sport",)
+
+
+# --- Field Extraction ---
+
+
+def _clean(value: Any) -> Optional[str]:
+    """Returns a stripped string, or None for null/empty values."""
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def _lower(value: Any) -> Optional[str]:
+    value = _clean(value)
+    return value.lower() if value else None
+
+
+def _competition_keys(team: Dict[str, Any]) -> Set[Tuple[str, str]]:
+    keys = set()
+    for competition in team.get("competitions") or []:
+        for field in ("id", "name"):
+            value = _clean((competition or {}).get(field))
+            if value:
+                keys.add((field, value))
+    return keys
+
+
+def _member_keys(team: Dict[str, Any]) -> Set[Tuple[str, str]]:
+    keys = set()
+    for member in team.get("teamMembers") or []:
+        individual = (member or {}).get("individual") or {}
+        individual_id = _clean(individual.get("id"))
+        full_name = _clean((individual.get("commonName") or {}).get("fullName"))
+        if individual_id:
+            keys.add(("id", individual_id))
+        if full_name:
+            keys.add(("fullName", full_name))
+    return keys
+
+
+def _column(values: List[Optional[str]]) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns (values, is_null) arrays for one extracted field."""
+    array = np.array(values, dtype=object)
+    return array, np.array([value is None for value in values], dtype=bool)
+
+
+# --- Pre-Screening ---
+
+
+def prescreen_mask(
+    source: Dict[str, Any], candidates: List[Dict[str, Any]], fields: Tuple[str, ...]
+) -> np.ndarray:
+    """
+    Step 1 of the weighted rubrics: a candidate passes unless, for any of
+    `fields`, both sides have a non-null value and the values differ.
+    """
+    passes = np.ones(len(candidates), dtype=bool)
+    for field in fields:
+        source_value = _clean(source.get(field))
+        if source_value is None:
+            continue
+        values, is_null = _column([_clean(c.get(field)) for c in candidates])
+        passes &= is_null | (values == source_value)
+    return passes
+
+
+def team_prescreen_mask(
+    source: Dict[str, Any], candidates: List[Dict[str, Any]]
+) -> np.ndarray:
+    return prescreen_mask(source, candidates, TEAM_PRESCREEN_FIELDS)
+
+
+def fixture_prescreen_mask(
+    source: Dict[str, Any], candidates: List[Dict[str, Any]]
+) -> np.ndarray:
+    return prescreen_mask(source, candidates, FIXTURE_PRESCREEN_FIELDS)
+
+
+# --- Team Weighted Scoring ---
+
+
+def score_team_candidates(
+    source: Dict[str, Any], candidates: List[Dict[str, Any]]
+) -> np.ndarray:
+    """
+    Applies TEAM_WEIGHTED_AUDIT_RULE to every candidate in one pass and returns
+    an (n_candidates, n_rules) matrix of awarded points.
+    """
+    if not candidates:
+        return np.zeros((0, len(TEAM_WEIGHTED_RULES)))
+
+    passes = team_prescreen_mask(source, candidates)
+
+    names, _ = _column([_lower(c.get("name")) for c in candidates])
+    source_name = _lower(source.get("name"))
+    name_match = (names == source_name) if source_name else np.zeros_like(passes)
+
+    source_competitions = _competition_keys(source)
+    competition_overlap = np.fromiter(
+        (not source_competitions.isdisjoint(_competition_keys(c)) for c in candidates),
+        dtype=bool,
+        count=len(candidates),
+    )
+
+    source_members = _member_keys(source)
+    member_overlap = np.fromiter(
+        (not source_members.isdisjoint(_member_keys(c)) for c in candidates),
+        dtype=bool,
+        count=len(candidates),
+    )
+
+    regions, region_null = _column([_lower(c.get("regionName")) for c in candidates])
+    source_region = _lower(source.get("regionName"))
+    region_match = region_null | (
+        (regions == source_region) if source_region else np.ones_like(passes)
+    )
+
+    team_types, type_null = _column([_clean(c.get("teamType")) for c in candidates])
+    source_type = _clean(source.get("teamType"))
+    type_match = type_null | (
+        (team_types == source_type) if source_type else np.ones_like(passes)
+    )
+
+    rule_results = np.column_stack(
+        [
+            passes,
+            name_match,
+            competition_overlap,
+            member_overlap,
+            region_match,
+            type_match,
+        ]
+    ).astype(bool)
+    # Disqualified candidates score 0 on every rule
+    rule_results &= passes[:, None]
+    return rule_results * TEAM_RULE_POINTS
+
+
+def format_weighted_result(
+    candidates: List[Dict[str, Any]],
+    points: np.ndarray,
+    rules: List[Tuple[str, float]],
+) -> str:
+    """
+    Renders the best-scoring candidate as the JSON final answer that
+    `final_answer.parse_final_answer` expects.
+    """
+    totals = points.sum(axis=1) if len(candidates) else np.zeros(0)
+    if not len(candidates) or totals.max() < MATCH_THRESHOLD:
+        return json.dumps(
+            {
+                "best_match_id": NO_MATCH,
+                "rules": [],
+                "justification": f"No candidate met the minimum score threshold of {MATCH_THRESHOLD} after a thorough audit.",
+            }
+        )
+
+    best = int(np.argmax(totals))
+    return json.dumps(
+        {
+            "best_match_id": candidates[best]["id"],
+            "rules": [
+                {"rule": label, "passed": bool(awarded), "points": float(awarded)}
+                for (label, _), awarded in zip(rules, points[best])
+            ],
+        }
+    )
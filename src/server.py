@@ -1,10 +1,43 @@
-from fastapi import FastAPI, HTTPException
+import time
+
+# Measured from import so /health can report cold-start time
+SERVER_STARTED = time.perf_counter()
+
+import asyncio
+import contextlib
+import json
+import os
+from typing import Any, AsyncIterator, Dict, List, Literal, Optional, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
 import uvicorn
-from er_agent import create_entity_matching_agent, run_single_process
-from sys_prompts import get_entity_matching_system_prompt
-from tools import get_agent_tools, add_multiple_numbers
+from agent_registry import (
+    AGENT_WARMUP,
+    ENTITY_TYPES,
+    SCORING_METHODS,
+    AgentRegistry,
+    parse_warmup,
+)
+from cache import CoalescingCache
+from jobs import Job, JobManager, JobQueueFull
+from http_client import aclose_clients
 
+# Batch Endpoint Limits
+MATCH_BATCH_MAX_IDS = int(os.getenv("MATCH_BATCH_MAX_IDS", "500"))
+MATCH_BATCH_MAX_CONCURRENCY = int(os.getenv("MATCH_BATCH_MAX_CONCURRENCY", "8"))
+
+# Match Result Cache Settings
+MATCH_CACHE_SIZE = int(os.getenv("MATCH_CACHE_SIZE", "2000"))
+MATCH_CACHE_TTL = float(os.getenv("MATCH_CACHE_TTL", "3600"))
+
+ERROR_MATCH_IDS = ("processing error", "decoding_error")
 
 app = FastAPI(
     title="Entity Matching Agent Server",
@@ -28,46 +61,139 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Create the agent on startup
-# entity_matching_agent = create_entity_matching_agent(
-#     get_entity_matching_system_prompt("weighted", "fixture"),
-#     [
-#         *get_agent_tools("fixture"),
-#         add_multiple_numbers,
-#     ],
-# )
-
-entity_matching_agent = create_entity_matching_agent(
-    get_entity_matching_system_prompt("weighted", "team"),
-    [
-        *get_agent_tools("team"),
-        add_multiple_numbers,
-    ],
-)
+# Executors are built on first use (or by the AGENT_WARMUP list) so the port
+# opens before LangChain and the Bedrock client are loaded
+agent_registry = AgentRegistry()
+startup_timings = {"ready_s": None, "first_healthy_s": None}
+
+# Results keyed by (entity_type, scoring_method, source_gsl_id); concurrent
+# duplicate requests share one agent run
+match_cache = CoalescingCache(MATCH_CACHE_SIZE, MATCH_CACHE_TTL)
+
+# Agent runs started by batch requests, across all of them
+batch_slots = asyncio.Semaphore(MATCH_BATCH_MAX_CONCURRENCY)
+
+
+def _is_cacheable(result: Optional[Dict[str, Any]]) -> bool:
+    return result is not None and result.get("best_match_gsl_id") not in ERROR_MATCH_IDS
+
+
+@app.on_event("startup")
+async def start_agent_warmup():
+    startup_timings["ready_s"] = round(time.perf_counter() - SERVER_STARTED, 3)
+    print(f"Server ready in {startup_timings['ready_s']}s.")
+    warmup = parse_warmup(AGENT_WARMUP)
+    if warmup:
+        # Warm in the background; requests for a cold agent build it on demand
+        asyncio.create_task(asyncio.to_thread(agent_registry.warm, warmup))
+
+
+@app.on_event("startup")
+async def start_job_workers():
+    await job_manager.start()
+
+
+@app.on_event("shutdown")
+async def stop_job_workers():
+    await job_manager.stop()
+
+
+@app.on_event("shutdown")
+async def close_http_clients():
+    await aclose_clients()
+
+
+def _model_usage() -> Dict[str, Any]:
+    """Routing and rate limit totals, once an executor has loaded LangChain."""
+    if not agent_registry.stats():
+        return {}
+    from model_routing import route_stats
+    from rate_limit import rate_limit_stats
+
+    return {
+        "model_routing": route_stats.stats(),
+        "rate_limits": rate_limit_stats(),
+    }
+
+
+@app.get("/health")
+async def health():
+    """Reports liveness, cold-start timings and which agents are built."""
+    if startup_timings["first_healthy_s"] is None:
+        startup_timings["first_healthy_s"] = round(
+            time.perf_counter() - SERVER_STARTED, 3
+        )
+    return {
+        "status": "ok",
+        "uptime_s": round(time.perf_counter() - SERVER_STARTED, 3),
+        **startup_timings,
+        "agents": agent_registry.stats(),
+        "match_cache": match_cache.stats(),
+        "jobs": job_manager.stats(),
+        **_model_usage(),
+    }
+
+
+async def _cached_match(
+    entity_type: str,
+    scoring_method: str,
+    source_gsl_id: str,
+    slots: Optional[asyncio.Semaphore] = None,
+):
+    """
+    Runs (or joins, or reuses) the agent run for one source ID. Returns
+    (result, cache status, age); raises ValueError for unsupported agents.
+    A new run holds one of `slots` while it runs, even if the caller goes away.
+    """
+    agent_executor = await agent_registry.aget(entity_type, scoring_method)
+
+    from er_agent import run_single_process
+
+    async def load():
+        async with slots or contextlib.nullcontext():
+            return await run_single_process(
+                agent_executor=agent_executor, source_id=source_gsl_id
+            )
+
+    return await match_cache.get_or_load(
+        (entity_type, scoring_method, source_gsl_id),
+        load,
+        cacheable=_is_cacheable,
+    )
 
 
 @app.get("/match/")
-async def match_entity(source_gsl_id: str):
+async def match_entity(
+    response: Response,
+    source_gsl_id: str,
+    entity_type: Literal["team", "fixture"] = "team",
+    scoring_method: Literal["weighted", "binary", "weighted-native"] = "weighted",
+):
     """
-    Processes a single source GSL ID to find a matching entity.
+    Processes a single source GSL ID to find a matching entity. Results are
+    cached for `MATCH_CACHE_TTL` seconds and concurrent requests for the same
+    ID share one agent run; `X-Cache` reports HIT, MISS or COALESCED.
     - **source_gsl_id**: The GSL ID of the source entity to process.
+    - **entity_type**: `team` (default) or `fixture`.
+    - **scoring_method**: `weighted` (default), `binary` or `weighted-native`.
     """
     if not source_gsl_id:
         raise HTTPException(
             status_code=400, detail="source_gsl_id query parameter cannot be empty."
         )
 
-    result = await run_single_process(
-        agent_executor=entity_matching_agent, source_id=source_gsl_id
-    )
+    try:
+        result, cache_status, age = await _cached_match(
+            entity_type, scoring_method, source_gsl_id
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    response.headers["X-Cache"] = cache_status
 
     if result is None:
         raise HTTPException(status_code=500, detail="Agent returned an empty result.")
 
-    if (
-        result.get("best_match_gsl_id") == "processing error"
-        or result.get("best_match_gsl_id") == "decoding_error"
-    ):
+    if result.get("best_match_gsl_id") in ERROR_MATCH_IDS:
         raise HTTPException(
             status_code=500, detail=f"Agent processing error: {result.get('score')}"
         )
@@ -77,8 +203,187 @@ async def match_entity(source_gsl_id: str):
             status_code=404, detail=f"No match found for source GSL ID {source_gsl_id}."
         )
 
+    response.headers["Cache-Control"] = (
+        f"private, max-age={max(int(MATCH_CACHE_TTL - age), 0)}"
+    )
+    response.headers["Age"] = str(int(age))
+    return result
+
+
+@app.delete("/match/cache")
+async def invalidate_match_cache(
+    source_gsl_id: Optional[str] = None,
+    entity_type: Optional[Literal["team", "fixture"]] = None,
+    scoring_method: Optional[Literal["weighted", "binary", "weighted-native"]] = None,
+):
+    """
+    Drops cached match results: those of one source GSL ID (optionally for one
+    entity type / scoring method), or every cached result when no ID is given.
+    """
+    if source_gsl_id is None:
+        match_cache.invalidate()
+        return {"invalidated": "all"}
+
+    keys = [
+        (cached_type, cached_method, source_gsl_id)
+        for cached_type in ([entity_type] if entity_type else ENTITY_TYPES)
+        for cached_method in ([scoring_method] if scoring_method else SCORING_METHODS)
+    ]
+    for key in keys:
+        match_cache.invalidate(key)
+    return {"invalidated": [list(key) for key in keys]}
+
+
+# --- Batch Matching ---
+
+
+class MatchBatchRequest(BaseModel):
+    source_gsl_ids: List[str] = Field(description="The GSL IDs of the source entities.")
+    entity_type: Literal["team", "fixture"] = "team"
+    scoring_method: Literal["weighted", "binary", "weighted-native"] = "weighted"
+    concurrency: int = Field(
+        default=MATCH_BATCH_MAX_CONCURRENCY,
+        ge=1,
+        description="Maximum number of IDs processed in parallel (capped by the server).",
+    )
+
+
+def _batch_line(index: int, result: Dict[str, Any]) -> str:
+    """One NDJSON line: the result, or an error object for that ID alone."""
+    if result.get("best_match_gsl_id") in ERROR_MATCH_IDS:
+        item = {
+            "index": index,
+            "source_gsl_id": result.get("source_gsl_id"),
+            "status": "error",
+            "error": str(result.get("score")),
+        }
+    elif result.get("best_match_gsl_id") == "no match found":
+        item = {"index": index, "status": "no_match", **result}
+    else:
+        item = {"index": index, "status": "ok", **result}
+    return json.dumps(item, default=str) + "\n"
+
+
+async def _batch_match(
+    request: MatchBatchRequest,
+    index: int,
+    source_gsl_id: str,
+    request_slots: asyncio.Semaphore,
+) -> Tuple[int, Dict[str, Any]]:
+    async with request_slots:
+        result, _, _ = await _cached_match(
+            request.entity_type, request.scoring_method, source_gsl_id, batch_slots
+        )
+    return index, result
+
+
+@app.post("/match/batch")
+async def match_entities(request: MatchBatchRequest):
+    """
+    Processes a list of source GSL IDs with bounded concurrency and streams one
+    NDJSON line per ID as soon as it completes. `index` is the ID's position
+    in the request; a failed ID yields an error line instead of failing the
+    whole response. IDs share the `/match/` result cache, and agent runs are
+    bounded across all batch requests by `MATCH_BATCH_MAX_CONCURRENCY`.
+    """
+    source_ids = [source_id.strip() for source_id in request.source_gsl_ids]
+    if not source_ids or not all(source_ids):
+        raise HTTPException(
+            status_code=400, detail="source_gsl_ids must be a list of non-empty IDs."
+        )
+    if len(source_ids) > MATCH_BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {MATCH_BATCH_MAX_IDS} source_gsl_ids per request.",
+        )
+
+    try:
+        await agent_registry.aget(request.entity_type, request.scoring_method)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    request_slots = asyncio.Semaphore(
+        min(request.concurrency, MATCH_BATCH_MAX_CONCURRENCY)
+    )
+
+    async def stream_results() -> AsyncIterator[str]:
+        tasks = [
+            asyncio.create_task(_batch_match(request, index, source_id, request_slots))
+            for index, source_id in enumerate(source_ids)
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                index, result = await next_done
+                yield _batch_line(index, result)
+        finally:
+            # A client disconnect cancels this generator; runs already started
+            # finish in the background and fill the result cache
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+
+# --- Asynchronous Jobs ---
+
+
+class JobRequest(BaseModel):
+    source_gsl_id: str = Field(description="The GSL ID of the source entity.")
+    entity_type: Literal["team", "fixture"] = "team"
+    scoring_method: Literal["weighted", "binary", "weighted-native"] = "weighted"
+
+
+async def _run_job(job: Job) -> Dict[str, Any]:
+    result, _, _ = await _cached_match(
+        job.entity_type, job.scoring_method, job.source_gsl_id
+    )
+    if result is None:
+        raise RuntimeError("Agent returned an empty result.")
+    if result.get("best_match_gsl_id") in ERROR_MATCH_IDS:
+        raise RuntimeError(f"Agent processing error: {result.get('score')}")
     return result
 
 
+job_manager = JobManager(_run_job)
+
+
+@app.post("/jobs", status_code=202)
+async def submit_job(request: JobRequest, response: Response):
+    """
+    Queues a match job and returns its ID right away; poll `GET /jobs/{job_id}`
+    for the result. Returns 429 with Retry-After when the queue is full.
+    """
+    if not request.source_gsl_id.strip():
+        raise HTTPException(status_code=400, detail="source_gsl_id cannot be empty.")
+    if (request.entity_type, request.scoring_method) == ("fixture", "weighted-native"):
+        raise HTTPException(
+            status_code=400,
+            detail="weighted-native scoring is only available for teams.",
+        )
+
+    try:
+        job = job_manager.submit(
+            request.entity_type, request.scoring_method, request.source_gsl_id.strip()
+        )
+    except JobQueueFull as e:
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
+    response.headers["Location"] = f"/jobs/{job.job_id}"
+    return job.to_dict()
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Returns a job's status, and its result or error once it has finished."""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown or expired job {job_id}.")
+    return job.to_dict()
+
+
 if __name__ == "__main__":
     uvicorn.run("server:app", host="0.0.0.0", port=5000)
@@ -0,0 +1,116 @@
+import argparse
+import csv
+import glob
+import hashlib
+import os
+import re
+from typing import List, Optional, Tuple
+
+# A shard is (index, count) with 0 <= index < count
+Shard = Tuple[int, int]
+
+
+def parse_shard(value: str) -> Shard:
+    """Parses an `i/N` shard argument (0-based index, N shards)."""
+    match = re.fullmatch(r"\s*(\d+)\s*/\s*(\d+)\s*", value)
+    if not match:
+        raise argparse.ArgumentTypeError(f"expected i/N, got '{value}'")
+    index, count = int(match.group(1)), int(match.group(2))
+    if count < 1 or index >= count:
+        raise argparse.ArgumentTypeError(f"shard index must be in 0..{count - 1}")
+    return index, count
+
+
+def shard_of(source_id: str, shard_count: int) -> int:
+    """
+    Stable shard assignment: the first 32 bits of the MD5 of the ID, modulo
+    the shard count. Matches the Postgres pushdown in `data_sources`.
+    """
+    digest = hashlib.md5(str(source_id).encode("utf-8")).hexdigest()
+    return int(digest[:8], 16) % shard_count
+
+
+def in_shard(source_id: str, shard: Optional[Shard]) -> bool:
+    return shard is None or shard_of(source_id, shard[1]) == shard[0]
+
+
+# --- Shard Output Files ---
+
+
+def shard_output_path(output_path: str, shard: Shard) -> str:
+    """`results/out.csv` -> `results/out.shard-0-of-4.csv`."""
+    root, ext = os.path.splitext(output_path)
+    return f"{root}.shard-{shard[0]}-of-{shard[1]}{ext or '.csv'}"
+
+
+def find_shard_outputs(output_path: str) -> List[str]:
+    root, ext = os.path.splitext(output_path)
+    pattern = f"{glob.escape(root)}.shard-*-of-*{ext or '.csv'}"
+    return sorted(glob.glob(pattern))
+
+
+def merge_shard_outputs(output_path: str, shard_count: Optional[int] = None) -> int:
+    """
+    Streams the shard CSVs of `output_path` into `output_path`, keeping the
+    first row seen per source ID. With `shard_count`, shards that have no
+    output yet are reported. Returns the number of merged rows.
+    """
+    if shard_count:
+        shard_paths = [
+            shard_output_path(output_path, (index, shard_count))
+            for index in range(shard_count)
+        ]
+        missing = [path for path in shard_paths if not os.path.exists(path)]
+        for path in missing:
+            print(f"Warning: shard output '{path}' does not exist.")
+        shard_paths = [path for path in shard_paths if path not in missing]
+    else:
+        shard_paths = find_shard_outputs(output_path)
+
+    if not shard_paths:
+        print(f"No shard outputs found for '{output_path}'.")
+        return 0
+
+    with open(shard_paths[0], "r", newline="", encoding="utf-8") as infile:
+        fields = next(csv.reader(infile), None)
+
+    # Shards hold disjoint IDs, so only IDs (not rows) need to be remembered
+    seen = set()
+    with open(output_path, "w", newline="", encoding="utf-8") as outfile:
+        writer = csv.DictWriter(outfile, fieldnames=fields, extrasaction="ignore")
+        writer.writeheader()
+        for path in shard_paths:
+            with open(path, "r", newline="", encoding="utf-8") as infile:
+                for row in csv.DictReader(infile):
+                    if row["source_gsl_id"] in seen:
+                        continue
+                    seen.add(row["source_gsl_id"])
+                    writer.writerow(row)
+
+    print(
+        f"Merged {len(seen)} rows from {len(shard_paths)} shards into '{output_path}'."
+    )
+    return len(seen)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Shard output utilities.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    merge_parser = subparsers.add_parser(
+        "merge", help="Combine per-shard output CSVs into one CSV."
+    )
+    merge_parser.add_argument(
+        "output_path",
+        type=str,
+        help="The output path the shards were run with; the merged CSV is written here.",
+    )
+    merge_parser.add_argument(
+        "--shards",
+        type=int,
+        default=None,
+        help="Expected shard count; missing shard outputs are reported.",
+    )
+    args = parser.parse_args()
+
+    if args.command == "merge":
+        merge_shard_outputs(args.output_path, args.shards)
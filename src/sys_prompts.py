@@ -41,34 +41,32 @@ If a candidate passes Step 1, its final score is the sum of the points from the
 ---
 
 ### Final Answer Formatting
-To construct your final answer, you will perform these three steps **in order**:
-
-1.  **First, write the Justification:** Generate the detailed audit checklist for the winning candidate, explicitly stating the result and points for each rule that was evaluated.
-2.  **Second, Calculate the Total Score via Tool:**
-    * From the `Justification` you just generated, extract the individual points awarded.
-    * You **MUST** call the `add_multiple_numbers` tool with a list of these numbers.
-    * The result returned by the tool is your `Total Score`.
-3.  **Third, assemble the final output** using the pieces you have prepared.
-
-- If the highest score is 2 or more:
-> Best Match ID: [The id of the best match]
->
-> Score: [Result from the add_multiple_numbers tool]
->
-> Justification:
-> * Core Attributes Match (Rule 1): Pass, Score: 1
-> * Name Match (Rule 2): Pass, Score: 2
-> * Competition Overlap (Rule 3): Fail, Score: 0
-> * Team Member Overlap (Rule 4): Pass, Score: 0.5
-> * Region Match (Rule 5): Pass, Score: 0.5
-> * Team Type Match (Rule 6): Pass, Score: 0.5
+Submit your final answer by calling the `submit_match` tool exactly once, with the arguments shown below. Calling it ends your run, so do not write a separate text answer. Do not add up the points yourself; the total score is computed from the `rules` you report. If the submission is rejected, fix the arguments and call `submit_match` again.
+
+- If the highest score is 2 or more, report the audit checklist of the winning candidate with the result and points of every rule:
+```json
+{
+  "best_match_id": "[The id of the best match]",
+  "rules": [
+    {"rule": "Core Attributes Match (Rule 1)", "passed": true, "points": 1},
+    {"rule": "Name Match (Rule 2)", "passed": true, "points": 2},
+    {"rule": "Competition Overlap (Rule 3)", "passed": false, "points": 0},
+    {"rule": "Team Member Overlap (Rule 4)", "passed": true, "points": 0.5},
+    {"rule": "Region Match (Rule 5)", "passed": true, "points": 0.5},
+    {"rule": "Team Type Match (Rule 6)", "passed": true, "points": 0.5}
+  ],
+  "justification": "[Optional short note]"
+}
+```
 
 - If no candidate scores 2 or more (or no candidates were found):
-> Best Match ID: no match found
->
-> Score: 0
->
-> Justification: No candidate met the minimum score threshold of 2 after a thorough audit.
+```json
+{
+  "best_match_id": "no match found",
+  "rules": [],
+  "justification": "No candidate met the minimum score threshold of 2 after a thorough audit."
+}
+```
 """
 
 FIXTURE_WEIGHTED_AUDIT_RULE = """
@@ -116,33 +114,49 @@ If a candidate passes Step 1, its final score is the sum of the points from the
 ---
 
 ### Final Answer Formatting
-To construct your final answer, you will perform these three steps **in order**:
-
-1.  **First, write the Justification:** Generate the detailed audit checklist for the winning candidate, explicitly stating the result and points for each rule that was evaluated.
-2.  **Second, Calculate the Total Score via Tool:**
-    * From the `Justification` you just generated, extract the individual points awarded.
-    * You **MUST** call the `add_multiple_numbers` tool with a list of these numbers.
-    * The result returned by the tool is your `Total Score`.
-3.  **Third, assemble the final output** using the pieces you have prepared.
-
-- If the highest score is 2 or more:
-> Best Match ID: [The id of the best match]
->
-> Score: [Result from the add_multiple_numbers tool]
->
-> Justification:
-> * Pre-Screening (Sport): Pass, Score: 1
-> * Team Match: Pass, Score: 1.5
-> * Result Match: Pass, Score: 1
-> * Date Proximity Match: Pass, Score: 0.5
-> * ... etc.
+Submit your final answer by calling the `submit_match` tool exactly once, with the arguments shown below. Calling it ends your run, so do not write a separate text answer. Do not add up the points yourself; the total score is computed from the `rules` you report. If the submission is rejected, fix the arguments and call `submit_match` again.
+
+- If the highest score is 2 or more, report the audit checklist of the winning candidate with the result and points of every rule:
+```json
+{
+  "best_match_id": "[The id of the best match]",
+  "rules": [
+    {"rule": "Pre-Screening (Sport)", "passed": true, "points": 1},
+    {"rule": "Team Match", "passed": true, "points": 1.5},
+    {"rule": "Result Match", "passed": true, "points": 1},
+    {"rule": "Date Proximity Match", "passed": true, "points": 0.5},
+    {"rule": "Competition Match", "passed": false, "points": 0},
+    {"rule": "Participant Overlap", "passed": true, "points": 0.5}
+  ],
+  "justification": "[Optional short note]"
+}
+```
 
 - If no candidate scores 2 or more (or no candidates were found):
-> Best Match ID: no match found
->
-> Score: 0
->
-> Justification: No candidate met the minimum score threshold of 2 after a thorough audit.
+```json
+{
+  "best_match_id": "no match found",
+  "rules": [],
+  "justification": "No candidate met the minimum score threshold of 2 after a thorough audit."
+}
+```
+"""
+
+
+TEAM_PAYLOAD_NOTES = """
+### Payload Notes
+Tool results are compacted to the fields the audit uses:
+* `teamMembers.individualIds`, `teamMembers.fullNames` and `teamMembers.preferredJerseys` list the source's `teamMembers.individual.id`, `teamMembers.individual.commonName.fullName` and `teamMembers.preferredJersey` values.
+* For candidates, `teamMembers.sharedIndividualIds`, `teamMembers.sharedFullNames` and `teamMembers.sharedPreferredJerseys` list only the values that also appear on the source. A non-empty list means that overlap check passes.
+* A `...Truncated` count means that list was shortened to fit the response size.
+"""
+
+FIXTURE_PAYLOAD_NOTES = """
+### Payload Notes
+Tool results are compacted to the fields the audit uses:
+* `participants.individualIds` lists every `individual.id` and `fixtureRosters.individualId` of the source.
+* For candidates, `participants.sharedIndividualIds` lists only the participant ids that also appear on the source. A non-empty list means the Participant Overlap check passes.
+* A `...Truncated` count means that list was shortened to fit the response size.
 """
 
 
@@ -158,6 +172,16 @@ A candidate is a valid merge candidate **if and only if ALL** of the following c
 7.  The list of `teamMembers.preferredJersey` or `teamMembers.individual.id` or `teamMembers.individual.commonName.fullName` or `teamMembers.individual.commonName.givenName` or `teamMembers.individual.commonName.familyName` values must have at least one exact match.
 """
 
+FIXTURE_BINARY_AUDIT_RULE = """
+### Mandatory Exact Match Checklist
+A candidate is a valid merge candidate **if and only if ALL** of the following conditions are true when compared to the source entity. Two teams match if their `id` values are an exact match or their `name` values are an exact, case-insensitive match.
+1.  `sport` must be an exact match or null/empty in either the source or candidate.
+2.  `homeTeam` must match the candidate's `homeTeam` and `awayTeam` must match the candidate's `awayTeam`, or both must match the other way round.
+3.  `localDate` must be within one day (before or after) of the source's `localDate`.
+4.  The list of `competition.name` or `competition.id` values must have at least one exact match.
+5.  The participants must overlap in at least one `individual.id` or `fixtureRosters.individualId`.
+"""
+
 
 def get_weighted_scoring_prompt(audit_rule: str) -> str:
     """
@@ -170,14 +194,14 @@ You are the Zero-Tolerance Validator (ZTV), a data validation automaton. Your on
 **Your Non-Negotiable Directives:**
 1.  **LITERAL DATA ONLY:** You must work exclusively with the data provided by the tools.
 2.  **PROTOCOL IS LAW:** The "Strict Execution Protocol" and "Mandatory Audit" are an exact algorithm you must follow.
-3.  **DELEGATE CALCULATIONS:** To calculate the total score, you **MUST** use the `add_multiple_numbers` tool.
+3.  **REPORT POINTS, NOT TOTALS:** Report the points of each rule via `submit_match`; the total score is calculated for you.
 
 ---
 
 ### Strict Execution Protocol
 1.  **Fetch Source:** Get source entity data via `get_entity_by_id`.
-2.  **Find Candidates:** Get potential candidates via `find_matching_entities`.
-3.  **Audit Each Candidate:** For every remaining candidate, meticulously apply the **Mandatory Audit** below.
+2.  **Find Candidates:** Get pre-screened candidates, with their full details, via `find_screened_candidates`. The source entity and every candidate that fails the Step 1 Pre-Screening Check have already been removed, so each returned candidate has passed Step 1. Do not fetch candidates one by one.
+3.  **Audit Each Candidate:** For every returned candidate, meticulously apply the **Mandatory Audit** below.
 4.  **Identify Winner:** Determine the candidate with the highest score.
 5.  **Construct Final Report:** Follow the "Final Answer Formatting" instructions precisely.
 
@@ -203,11 +227,10 @@ You are a deterministic data processing bot. Your only function is to execute th
 
 ### Strict Execution Protocol
 1.  **Fetch Source:** Get source entity data via `get_entity_by_id`.
-2.  **Find Candidates:** Get potential candidates via `find_matching_entities`.
-3.  **Filter Self:** Immediately remove the source entity from the candidate list.
-4.  **Audit Each Candidate:** For every remaining candidate, check if it passes **ALL** conditions in the **Mandatory Exact Match Checklist**.
-5.  **Identify First Valid Match:** The first candidate that passes all checks is the winner. Stop auditing further candidates.
-6.  **Construct Final Report:** Follow the "Final Answer Formatting" instructions precisely.
+2.  **Find Candidates:** Get candidates, with their full details, via `find_screened_candidates`. The source entity and every candidate with an explicit `sport` or `gender` mismatch have already been removed. Do not fetch candidates one by one.
+3.  **Audit Each Candidate:** For every returned candidate, check if it passes **ALL** conditions in the **Mandatory Exact Match Checklist**.
+4.  **Identify First Valid Match:** The first candidate that passes all checks is the winner. Stop auditing further candidates.
+5.  **Construct Final Report:** Follow the "Final Answer Formatting" instructions precisely.
 
 ---
 
@@ -216,23 +239,25 @@ You are a deterministic data processing bot. Your only function is to execute th
 ---
 
 ### Final Answer Formatting
-Your final answer MUST be in the following format. There is no score.
+Submit your final answer by calling the `submit_match` tool exactly once, with the arguments shown below. Calling it ends your run, so do not write a separate text answer. There is no partial score. If the submission is rejected, fix the arguments and call `submit_match` again.
 
 - If a candidate passes the Exact Match Checklist:
-
-> Best Match ID: [The id of the valid match]
->
-> Score: 1
->
-> Justification: The candidate passed all conditions of the Exact Match Checklist.
+```json
+{{
+  "best_match_id": "[The id of the valid match]",
+  "rules": [{{"rule": "Exact Match Checklist", "passed": true, "points": 1}}],
+  "justification": "The candidate passed all conditions of the Exact Match Checklist."
+}}
+```
 
 - If NO candidates pass the Exact Match Checklist:
-
-> Best Match ID: no match found
->
-> Score: 0
->
-> Justification: No candidate passed all conditions of the strict Exact Match Checklist.
+```json
+{{
+  "best_match_id": "no match found",
+  "rules": [],
+  "justification": "No candidate passed all conditions of the strict Exact Match Checklist."
+}}
+```
 """
 
 
@@ -243,14 +268,22 @@ def get_entity_matching_system_prompt(scoring_method: str, entity_type: str) ->
 
     if scoring_method.lower() == "weighted":
         if entity_type.lower() == "team":
-            return get_weighted_scoring_prompt(TEAM_WEIGHTED_AUDIT_RULE)
+            return get_weighted_scoring_prompt(
+                TEAM_WEIGHTED_AUDIT_RULE + TEAM_PAYLOAD_NOTES
+            )
         if entity_type.lower() == "fixture":
-            return get_weighted_scoring_prompt(FIXTURE_WEIGHTED_AUDIT_RULE)
+            return get_weighted_scoring_prompt(
+                FIXTURE_WEIGHTED_AUDIT_RULE + FIXTURE_PAYLOAD_NOTES
+            )
 
     if scoring_method.lower() == "binary":
         if entity_type.lower() == "team":
-            return get_binary_scoring_prompt(TEAM_BINARY_AUDIT_RULE)
+            return get_binary_scoring_prompt(
+                TEAM_BINARY_AUDIT_RULE + TEAM_PAYLOAD_NOTES
+            )
         if entity_type.lower() == "fixture":
-            return get_binary_scoring_prompt(TEAM_BINARY_AUDIT_RULE)
+            return get_binary_scoring_prompt(
+                FIXTURE_BINARY_AUDIT_RULE + FIXTURE_PAYLOAD_NOTES
+            )
 
     return ""
@@ -1,10 +1,17 @@
+import asyncio
 import base64
 import json
 import os
-import requests
-from typing import List, Dict, Any
+import httpx
+from typing import Awaitable, Callable, List, Dict, Any, Optional
 
-from langchain_core.tools import tool
+from langchain_core.tools import StructuredTool, tool
+
+from cache import entity_cache, normalize_search_term, search_cache
+from http_client import get_async_client, get_client
+from rate_limit import graphql_governor
+from scoring import fixture_prescreen_mask, team_prescreen_mask
+from projection import serialize_entity, serialize_screened_candidates
 
 # from langchain_community.tools.tavily_search import TavilySearchResults
 from pydantic import BaseModel, Field
@@ -23,6 +30,109 @@ HEADERS = {
     "Content-Type": "application/json",
 }
 
+# Maximum number of IDs sent in a single multi-value ID query
+HYDRATION_CHUNK_SIZE = int(os.getenv("GRAPHQL_HYDRATION_CHUNK_SIZE", "50"))
+
+TEAM_FIELDS = "id name sport gender regionName teamType teamMembers { preferredJersey individual { id commonName { fullName } } } competitions { id name }"
+FIXTURE_FIELDS = "id localDate homeTeam { id name } awayTeam { id name } sport competitionName result { scores { teamId standardScore additionalScore } } individuals { nodes { id commonName { fullName } } } fixtureRosters { nodes { individualId teamId jersey qualifier } }"
+
+
+# --- Helpers ---
+
+
+def to_gsl_id(entity_id: str, entity_type: str) -> str:
+    """Returns the raw GSL ID for either a raw ID or a base64 searchable ID."""
+    prefix = f"GSLSearchable{entity_type.capitalize()}"
+    try:
+        decoded = base64.b64decode(entity_id.strip(), validate=True).decode("utf-8")
+    except Exception:
+        return entity_id.strip()
+    return decoded[len(prefix) :] if decoded.startswith(prefix) else entity_id.strip()
+
+
+def _chunked(items: List[str], size: int) -> List[List[str]]:
+    return [items[i : i + size] for i in range(0, len(items), size)]
+
+
+def _post_graphql(query: str) -> Dict[str, Any]:
+    """
+    Posts a GraphQL query over the shared pooled client and returns the JSON
+    body. Calls are rate limited, and timeouts and 429/5xx responses retried,
+    by the shared GraphQL rate governor.
+    """
+
+    def post() -> Dict[str, Any]:
+        response = get_client().post(
+            GRAPHQL_ENDPOINT, headers=HEADERS, content=json.dumps({"query": query})
+        )
+        response.raise_for_status()
+        return response.json()
+
+    return graphql_governor.call(post)
+
+
+async def _apost_graphql(query: str) -> Dict[str, Any]:
+    """Async variant of `_post_graphql` that does not block the event loop."""
+
+    async def post() -> Dict[str, Any]:
+        response = await get_async_client().post(
+            GRAPHQL_ENDPOINT, headers=HEADERS, content=json.dumps({"query": query})
+        )
+        response.raise_for_status()
+        return response.json()
+
+    return await graphql_governor.acall(post)
+
+
+def _search_results(
+    data: Dict[str, Any], collection: str, list_field: str
+) -> Optional[List[Dict[str, Any]]]:
+    """Returns the items of a search response, or None if the query failed."""
+    if "errors" in data:
+        print(f"GraphQL API returned an error: {data['errors']}")
+        return None
+    return data.get("data", {}).get(collection, {}).get(list_field, [])
+
+
+def _without_source(
+    items: List[Dict[str, Any]], source_id: str, entity_type: str
+) -> List[Dict[str, Any]]:
+    """Drops the source entity itself from a list of search results."""
+    encoded_source_id = base64.b64encode(
+        f"GSLSearchable{entity_type.capitalize()}{source_id}".encode("utf-8")
+    ).decode("utf-8")
+    return [item for item in items if item.get("id") != encoded_source_id]
+
+
+def tool_with_coroutine(
+    func: Callable,
+    coroutine: Callable[..., Awaitable],
+    args_schema: type,
+    serialize: Optional[Callable[[Any], str]] = None,
+) -> StructuredTool:
+    """
+    Builds a tool that runs `func` under invoke and `coroutine` under ainvoke.
+    If `serialize` is given, the tool returns `serialize(result)` to the agent
+    while `func`/`coroutine` keep returning raw payloads to Python callers.
+    """
+    name, description = func.__name__.lstrip("_"), func.__doc__
+    if serialize is not None:
+        raw_func, raw_coroutine = func, coroutine
+
+        def func(**kwargs):
+            return serialize(raw_func(**kwargs))
+
+        async def coroutine(**kwargs):
+            return serialize(await raw_coroutine(**kwargs))
+
+    return StructuredTool.from_function(
+        func=func,
+        coroutine=coroutine,
+        name=name,
+        description=description,
+        args_schema=args_schema,
+    )
+
 
 # ---Step 1: Tool Definitions ---
 
@@ -32,37 +142,67 @@ class GetTeamByIdInput(BaseModel):
     team_id: str = Field(description="The unique ID of the team to retrieve.")
 
 
-@tool(args_schema=GetTeamByIdInput)
-def get_team_by_id(team_id: str) -> Dict[str, Any]:
-    """Fetches the full details for a single team by its unique ID."""
-    get_team_query = f"""
+def _team_by_id_query(team_id: str) -> str:
+    return f"""
         query getTeams {{
           searchableTeams(query: [{{ field: ID, operator: EQUALS, values: ["{team_id}"] }}]) {{
-            items {{ id name sport gender regionName teamType teamMembers {{ preferredJersey individual {{ id commonName {{ fullName }} }} }} competitions {{ id name }} }}
+            items {{ {TEAM_FIELDS} }}
           }}
         }}
     """
+
+
+def _team_from_response(data: Dict[str, Any], team_id: str) -> Dict[str, Any]:
+    if "errors" in data:
+        return {"error": "GraphQL query failed.", "details": data["errors"]}
+
+    items = data.get("data", {}).get("searchableTeams", {}).get("items", [])
+    return items[0] if items else {"error": f"No entity found with GSL ID {team_id}"}
+
+
+def _get_team_by_id(team_id: str) -> Dict[str, Any]:
+    """Fetches the full details for a single team by its unique ID."""
+    gsl_id = to_gsl_id(team_id, "team")
+    cached = entity_cache.get("team", gsl_id)
+    if cached is not None:
+        return cached
+
     try:
-        response = requests.post(
-            GRAPHQL_ENDPOINT,
-            headers=HEADERS,
-            data=json.dumps({"query": get_team_query}),
-        )
-        response.raise_for_status()
-        data = response.json()
-        if "errors" in data:
-            return {"error": "GraphQL query failed.", "details": data["errors"]}
+        team = _team_from_response(_post_graphql(_team_by_id_query(team_id)), team_id)
+    except httpx.HTTPError as e:
+        return {"error": f"API call failed: {e}"}
+    except (json.JSONDecodeError, IndexError):
+        return {"error": "Failed to parse API response or find entity."}
 
-        items = data.get("data", {}).get("searchableTeams", {}).get("items", [])
-        return (
-            items[0] if items else {"error": f"No entity found with GSL ID {team_id}"}
-        )
+    entity_cache.put("team", gsl_id, team)
+    return team
+
+
+async def _aget_team_by_id(team_id: str) -> Dict[str, Any]:
+    gsl_id = to_gsl_id(team_id, "team")
+    cached = entity_cache.get("team", gsl_id)
+    if cached is not None:
+        return cached
 
-    except requests.exceptions.RequestException as e:
+    try:
+        data = await _apost_graphql(_team_by_id_query(team_id))
+        team = _team_from_response(data, team_id)
+    except httpx.HTTPError as e:
         return {"error": f"API call failed: {e}"}
     except (json.JSONDecodeError, IndexError):
         return {"error": "Failed to parse API response or find entity."}
 
+    entity_cache.put("team", gsl_id, team)
+    return team
+
+
+get_team_by_id = tool_with_coroutine(
+    _get_team_by_id,
+    _aget_team_by_id,
+    GetTeamByIdInput,
+    lambda team: serialize_entity(team, "team"),
+)
+
 
 # --- Tool 2: Search for Matching Teams ---
 class FindMatchingTeamsInput(BaseModel):
@@ -72,45 +212,62 @@ class FindMatchingTeamsInput(BaseModel):
     )
 
 
-@tool(args_schema=FindMatchingTeamsInput)
-def find_matching_teams(source_team_id: str, search_term: str) -> List[Dict[str, Any]]:
-    """Searches for teams by a keyword and returns a list of potential matches."""
-
-    encoded_source_id = base64.b64encode(
-        f"GSLSearchableTeam{source_team_id}".encode("utf-8")
-    ).decode("utf-8")
-
-    get_teams_query = f"""
+def _search_teams_query(search_term: str) -> str:
+    return f"""
         query searchTeams {{
           searchableTeams(searchTerm: "{search_term}") {{
             items {{ id }}
           }}
         }}
     """
-    try:
-        response = requests.post(
-            GRAPHQL_ENDPOINT,
-            headers=HEADERS,
-            data=json.dumps({"query": get_teams_query}),
-        )
-        response.raise_for_status()
-        data = response.json()
-        if "errors" in data:
-            print(f"GraphQL API returned an error: {data['errors']}")
+
+
+def _find_matching_teams(source_team_id: str, search_term: str) -> List[Dict[str, Any]]:
+    """Searches for teams by a keyword and returns a list of potential matches."""
+    cache_key = ("team", normalize_search_term(search_term))
+    items = search_cache.get(cache_key)
+    if items is None:
+        try:
+            data = _post_graphql(_search_teams_query(search_term))
+        except httpx.HTTPError as e:
+            print(f"API call failed: {e}")
+            return []
+        except json.JSONDecodeError:
+            print("Failed to parse API response.")
+            return []
+        items = _search_results(data, "searchableTeams", "items")
+        if items is None:
             return []
+        search_cache.set(cache_key, items)
 
-        searched_items = (
-            data.get("data", {}).get("searchableTeams", {}).get("items", [])
-        )
+    return _without_source(items, source_team_id, "team")
 
-        return [item for item in searched_items if item.get("id") != encoded_source_id]
 
-    except requests.exceptions.RequestException as e:
-        print(f"API call failed: {e}")
-        return []
-    except json.JSONDecodeError:
-        print("Failed to parse API response.")
-        return []
+async def _afind_matching_teams(
+    source_team_id: str, search_term: str
+) -> List[Dict[str, Any]]:
+    cache_key = ("team", normalize_search_term(search_term))
+    items = search_cache.get(cache_key)
+    if items is None:
+        try:
+            data = await _apost_graphql(_search_teams_query(search_term))
+        except httpx.HTTPError as e:
+            print(f"API call failed: {e}")
+            return []
+        except json.JSONDecodeError:
+            print("Failed to parse API response.")
+            return []
+        items = _search_results(data, "searchableTeams", "items")
+        if items is None:
+            return []
+        search_cache.set(cache_key, items)
+
+    return _without_source(items, source_team_id, "team")
+
+
+find_matching_teams = tool_with_coroutine(
+    _find_matching_teams, _afind_matching_teams, FindMatchingTeamsInput
+)
 
 
 # --- Tool 3: Decode Base64 encoded ids ---
@@ -134,64 +291,74 @@ def decode_base64_id(encoded_id: str) -> str:
         return ""
 
 
-# --- Tool 4: Add Multiple Numbers ---
-class AddNumbersInput(BaseModel):
-    numbers: List[float] = Field(description="A list of numbers to add together.")
-
-
-@tool(args_schema=AddNumbersInput)
-def add_multiple_numbers(numbers: List[float]) -> int:
-    """Adds multiple numbers together and returns the sum."""
-    try:
-        if not numbers:
-            return 0
-
-        total = sum(numbers)
-
-        return total
-
-    except Exception as e:
-        print(f"Error adding numbers: {e}")
-        return 0
-
-
 # --- Tool 5: Get Fixture by ID ---
 class GetFixtureByIdInput(BaseModel):
     fixture_id: str = Field(description="The unique ID of the fixture to retrieve.")
 
 
-@tool(args_schema=GetFixtureByIdInput)
-def get_fixture_by_id(fixture_id: str) -> Dict[str, Any]:
-    """Fetches the full details for a single fixture by its unique ID."""
-    query = f"""
+def _fixture_by_id_query(fixture_id: str) -> str:
+    return f"""
         query getFixtures {{
           searchableFixtures(query: [{{ field: ID, operator: EQUALS, values: ["{fixture_id}"] }}]) {{
-            nodes {{ id localDate homeTeam {{ id name }} awayTeam {{ id name }} sport competitionName result {{ scores {{ teamId standardScore additionalScore }} }} individuals {{ nodes {{ id commonName {{ fullName }} }} }} fixtureRosters {{ nodes {{ individualId teamId jersey qualifier }} }}
-            }}
+            nodes {{ {FIXTURE_FIELDS} }}
           }}
         }}
     """
+
+
+def _fixture_from_response(data: Dict[str, Any], fixture_id: str) -> Dict[str, Any]:
+    if "errors" in data:
+        return {"error": "GraphQL query failed.", "details": data["errors"]}
+
+    nodes = data.get("data", {}).get("searchableFixtures", {}).get("nodes", [])
+    return nodes[0] if nodes else {"error": f"No fixture found with ID {fixture_id}"}
+
+
+def _get_fixture_by_id(fixture_id: str) -> Dict[str, Any]:
+    """Fetches the full details for a single fixture by its unique ID."""
+    gsl_id = to_gsl_id(fixture_id, "fixture")
+    cached = entity_cache.get("fixture", gsl_id)
+    if cached is not None:
+        return cached
+
     try:
-        response = requests.post(
-            GRAPHQL_ENDPOINT,
-            headers=HEADERS,
-            data=json.dumps({"query": query}),
+        fixture = _fixture_from_response(
+            _post_graphql(_fixture_by_id_query(fixture_id)), fixture_id
         )
-        response.raise_for_status()
-        data = response.json()
-        if "errors" in data:
-            return {"error": "GraphQL query failed.", "details": data["errors"]}
+    except httpx.HTTPError as e:
+        return {"error": f"API call failed: {e}"}
+    except (json.JSONDecodeError, IndexError):
+        return {"error": "Failed to parse API response or find fixture."}
 
-        nodes = data.get("data", {}).get("searchableFixtures", {}).get("nodes", [])
-        return (
-            nodes[0] if nodes else {"error": f"No fixture found with ID {fixture_id}"}
-        )
+    entity_cache.put("fixture", gsl_id, fixture)
+    return fixture
+
+
+async def _aget_fixture_by_id(fixture_id: str) -> Dict[str, Any]:
+    gsl_id = to_gsl_id(fixture_id, "fixture")
+    cached = entity_cache.get("fixture", gsl_id)
+    if cached is not None:
+        return cached
 
-    except requests.exceptions.RequestException as e:
+    try:
+        data = await _apost_graphql(_fixture_by_id_query(fixture_id))
+        fixture = _fixture_from_response(data, fixture_id)
+    except httpx.HTTPError as e:
         return {"error": f"API call failed: {e}"}
     except (json.JSONDecodeError, IndexError):
         return {"error": "Failed to parse API response or find fixture."}
 
+    entity_cache.put("fixture", gsl_id, fixture)
+    return fixture
+
+
+get_fixture_by_id = tool_with_coroutine(
+    _get_fixture_by_id,
+    _aget_fixture_by_id,
+    GetFixtureByIdInput,
+    lambda fixture: serialize_entity(fixture, "fixture"),
+)
+
 
 # --- Tool 6: Find Matching Fixtures ---
 class FindMatchingFixturesInput(BaseModel):
@@ -201,47 +368,332 @@ class FindMatchingFixturesInput(BaseModel):
     )
 
 
-@tool(args_schema=FindMatchingFixturesInput)
-def find_matching_fixtures(
+def _search_fixtures_query(search_term: str) -> str:
+    return f"""
+        query searchFixtures {{
+          searchableFixtures(searchTerm: "{search_term}") {{
+            nodes {{ id }}
+          }}
+        }}
+    """
+
+
+def _find_matching_fixtures(
     source_fixture_id: str, search_term: str
 ) -> List[Dict[str, Any]]:
     """Searches for fixtures by a keyword and returns a list of potential matches."""
+    cache_key = ("fixture", normalize_search_term(search_term))
+    items = search_cache.get(cache_key)
+    if items is None:
+        try:
+            data = _post_graphql(_search_fixtures_query(search_term))
+        except httpx.HTTPError as e:
+            print(f"API call failed: {e}")
+            return []
+        except json.JSONDecodeError:
+            print("Failed to parse API response.")
+            return []
+        items = _search_results(data, "searchableFixtures", "nodes")
+        if items is None:
+            return []
+        search_cache.set(cache_key, items)
 
-    encoded_source_id = base64.b64encode(
-        f"GSLSearchableFixture{source_fixture_id}".encode("utf-8")
-    ).decode("utf-8")
+    return _without_source(items, source_fixture_id, "fixture")
 
-    query = f"""
-        query searchFixtures {{
-          searchableFixtures(searchTerm: "{search_term}") {{
-            nodes {{ id }}
+
+async def _afind_matching_fixtures(
+    source_fixture_id: str, search_term: str
+) -> List[Dict[str, Any]]:
+    cache_key = ("fixture", normalize_search_term(search_term))
+    items = search_cache.get(cache_key)
+    if items is None:
+        try:
+            data = await _apost_graphql(_search_fixtures_query(search_term))
+        except httpx.HTTPError as e:
+            print(f"API call failed: {e}")
+            return []
+        except json.JSONDecodeError:
+            print("Failed to parse API response.")
+            return []
+        items = _search_results(data, "searchableFixtures", "nodes")
+        if items is None:
+            return []
+        search_cache.set(cache_key, items)
+
+    return _without_source(items, source_fixture_id, "fixture")
+
+
+find_matching_fixtures = tool_with_coroutine(
+    _find_matching_fixtures, _afind_matching_fixtures, FindMatchingFixturesInput
+)
+
+
+# --- Batched Hydration for Teams and Fixtures ---
+def _hydration_target(entity_type: str):
+    if entity_type == "team":
+        return "searchableTeams", "items", TEAM_FIELDS
+    return "searchableFixtures", "nodes", FIXTURE_FIELDS
+
+
+def _hydration_query(chunk: List[str], entity_type: str) -> str:
+    collection, list_field, fields = _hydration_target(entity_type)
+    return f"""
+        query hydrateEntities {{
+          {collection}(query: [{{ field: ID, operator: EQUALS, values: {json.dumps(chunk)} }}]) {{
+            {list_field} {{ {fields} }}
           }}
         }}
     """
-    try:
-        response = requests.post(
-            GRAPHQL_ENDPOINT,
-            headers=HEADERS,
-            data=json.dumps({"query": query}),
-        )
-        response.raise_for_status()
-        data = response.json()
-        if "errors" in data:
-            print(f"GraphQL API returned an error: {data['errors']}")
-            return []
 
-        searched_items = (
-            data.get("data", {}).get("searchableFixtures", {}).get("nodes", [])
-        )
-        return [item for item in searched_items if item.get("id") != encoded_source_id]
 
-    except requests.exceptions.RequestException as e:
-        print(f"API call failed: {e}")
+def _absorb_hydration_chunk(
+    chunk: List[str],
+    response: Any,
+    entity_type: str,
+    found: Dict[str, Dict[str, Any]],
+    errors: Dict[str, Dict[str, Any]],
+) -> List[str]:
+    """
+    Records the entities (or the failure) returned for one chunk and returns the
+    IDs that should be queried again because the server capped the page size.
+    """
+    collection, list_field, _ = _hydration_target(entity_type)
+    if isinstance(response, httpx.HTTPError):
+        errors.update({i: {"error": f"API call failed: {response}"} for i in chunk})
+        return []
+    if isinstance(response, json.JSONDecodeError):
+        errors.update({i: {"error": "Failed to parse API response."} for i in chunk})
         return []
-    except json.JSONDecodeError:
-        print("Failed to parse API response.")
+    if "errors" in response:
+        details = response["errors"]
+        errors.update(
+            {i: {"error": "GraphQL query failed.", "details": details} for i in chunk}
+        )
         return []
 
+    for entity in response.get("data", {}).get(collection, {}).get(list_field, []):
+        found[to_gsl_id(entity.get("id", ""), entity_type)] = entity
+
+    missing = [i for i in chunk if to_gsl_id(i, entity_type) not in found]
+    return missing if missing and len(missing) < len(chunk) else []
+
+
+def _hydration_results(
+    unique_ids: List[str],
+    entity_type: str,
+    found: Dict[str, Dict[str, Any]],
+    errors: Dict[str, Dict[str, Any]],
+) -> Dict[str, Dict[str, Any]]:
+    return {
+        entity_id: found.get(to_gsl_id(entity_id, entity_type))
+        or errors.get(entity_id)
+        or {"error": f"No {entity_type} found with GSL ID {entity_id}"}
+        for entity_id in unique_ids
+    }
+
+
+def _unique_ids(entity_ids: List[str]) -> List[str]:
+    return list(dict.fromkeys(i.strip() for i in entity_ids if i and i.strip()))
+
+
+def _cached_entities(unique_ids: List[str], entity_type: str) -> Dict[str, Any]:
+    gsl_ids = [to_gsl_id(i, entity_type) for i in unique_ids]
+    return entity_cache.get_many(entity_type, gsl_ids)
+
+
+def _fetch_entities_by_ids(
+    entity_ids: List[str], entity_type: str
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Fetches many entities with chunked multi-value ID queries. Returns a dict
+    keyed by each requested ID; IDs that could not be fetched map to an error.
+    """
+    unique_ids = _unique_ids(entity_ids)
+    found = _cached_entities(unique_ids, entity_type)
+    cached_ids = set(found)
+    errors: Dict[str, Dict[str, Any]] = {}
+    to_fetch = [i for i in unique_ids if to_gsl_id(i, entity_type) not in found]
+
+    pending_chunks = _chunked(to_fetch, HYDRATION_CHUNK_SIZE)
+    while pending_chunks:
+        chunk = pending_chunks.pop(0)
+        try:
+            response = _post_graphql(_hydration_query(chunk, entity_type))
+        except (httpx.HTTPError, json.JSONDecodeError) as e:
+            response = e
+        missing = _absorb_hydration_chunk(chunk, response, entity_type, found, errors)
+        if missing:
+            pending_chunks.append(missing)
+
+    entity_cache.put_many(
+        entity_type, {k: v for k, v in found.items() if k not in cached_ids}
+    )
+    return _hydration_results(unique_ids, entity_type, found, errors)
+
+
+async def _afetch_entities_by_ids(
+    entity_ids: List[str], entity_type: str, fresh: bool = False
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Async variant of `_fetch_entities_by_ids` that sends all chunks concurrently.
+    With `fresh`, cached payloads are ignored and every entity is refetched.
+    """
+    unique_ids = _unique_ids(entity_ids)
+    found = {} if fresh else _cached_entities(unique_ids, entity_type)
+    cached_ids = set(found)
+    errors: Dict[str, Dict[str, Any]] = {}
+    to_fetch = [i for i in unique_ids if to_gsl_id(i, entity_type) not in found]
+
+    async def fetch(chunk: List[str]):
+        try:
+            return await _apost_graphql(_hydration_query(chunk, entity_type))
+        except (httpx.HTTPError, json.JSONDecodeError) as e:
+            return e
+
+    pending_chunks = _chunked(to_fetch, HYDRATION_CHUNK_SIZE)
+    while pending_chunks:
+        responses = await asyncio.gather(*(fetch(chunk) for chunk in pending_chunks))
+        next_chunks = []
+        for chunk, response in zip(pending_chunks, responses):
+            missing = _absorb_hydration_chunk(
+                chunk, response, entity_type, found, errors
+            )
+            if missing:
+                next_chunks.append(missing)
+        pending_chunks = next_chunks
+
+    entity_cache.put_many(
+        entity_type, {k: v for k, v in found.items() if k not in cached_ids}
+    )
+    return _hydration_results(unique_ids, entity_type, found, errors)
+
+
+def fetch_teams_by_ids(team_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Fetches many teams in chunked multi-value queries, keyed by requested ID."""
+    return _fetch_entities_by_ids(team_ids, "team")
+
+
+async def afetch_teams_by_ids(
+    team_ids: List[str], fresh: bool = False
+) -> Dict[str, Dict[str, Any]]:
+    return await _afetch_entities_by_ids(team_ids, "team", fresh)
+
+
+def fetch_fixtures_by_ids(fixture_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Fetches many fixtures in chunked multi-value queries, keyed by requested ID."""
+    return _fetch_entities_by_ids(fixture_ids, "fixture")
+
+
+async def afetch_fixtures_by_ids(
+    fixture_ids: List[str], fresh: bool = False
+) -> Dict[str, Dict[str, Any]]:
+    return await _afetch_entities_by_ids(fixture_ids, "fixture", fresh)
+
+
+async def awarm_entity_cache(entity_type: str, entity_ids: List[str]) -> int:
+    """Bulk-loads entities into the entity cache; returns how many were fetched."""
+    entities = await _afetch_entities_by_ids(entity_ids, entity_type.lower())
+    return sum(1 for entity in entities.values() if "error" not in entity)
+
+
+# --- Tool 9: Find, Hydrate and Pre-Screen Candidates ---
+def screen_candidates(
+    source_id: str, hydrated: Dict[str, Dict[str, Any]], entity_type: str
+) -> Dict[str, Any]:
+    """
+    Applies the Step 1 pre-screen in Python to already hydrated entities (keyed
+    by requested ID, including the source) and returns the surviving candidates.
+    """
+    source = hydrated.get(source_id) or {"error": f"Source {source_id} not fetched."}
+    if "error" in source:
+        return {"error": f"Could not fetch source entity: {source['error']}"}
+
+    source_gsl_id = to_gsl_id(source_id, entity_type)
+    candidates = [
+        entity
+        for entity_id, entity in hydrated.items()
+        if "error" not in entity and to_gsl_id(entity_id, entity_type) != source_gsl_id
+    ]
+    prescreen = team_prescreen_mask if entity_type == "team" else fixture_prescreen_mask
+    passes = prescreen(source, candidates)
+    return {
+        "source": source,
+        "candidates": [c for c, passed in zip(candidates, passes) if passed],
+        "prescreen_disqualified": int(len(candidates) - passes.sum()),
+    }
+
+
+class FindScreenedTeamCandidatesInput(BaseModel):
+    source_team_id: str = Field(description="The ID of the source team")
+    search_term: str = Field(
+        description="A name or keyword to search for matching teams."
+    )
+
+
+def _find_screened_team_candidates(
+    source_team_id: str, search_term: str
+) -> Dict[str, Any]:
+    """Searches for teams by a keyword and returns the full details of every candidate that passes the Step 1 sport/gender pre-screen. Disqualified candidates and the source team are already removed."""
+    search_results = _find_matching_teams(source_team_id, search_term)
+    hydrated = fetch_teams_by_ids(
+        [source_team_id, *(item["id"] for item in search_results)]
+    )
+    return screen_candidates(source_team_id, hydrated, "team")
+
+
+async def _afind_screened_team_candidates(
+    source_team_id: str, search_term: str
+) -> Dict[str, Any]:
+    search_results = await _afind_matching_teams(source_team_id, search_term)
+    hydrated = await afetch_teams_by_ids(
+        [source_team_id, *(item["id"] for item in search_results)]
+    )
+    return screen_candidates(source_team_id, hydrated, "team")
+
+
+find_screened_team_candidates = tool_with_coroutine(
+    _find_screened_team_candidates,
+    _afind_screened_team_candidates,
+    FindScreenedTeamCandidatesInput,
+    lambda screened: serialize_screened_candidates(screened, "team"),
+)
+
+
+class FindScreenedFixtureCandidatesInput(BaseModel):
+    source_fixture_id: str = Field(description="The ID of the source fixture")
+    search_term: str = Field(
+        description="A name or keyword to search for matching fixtures."
+    )
+
+
+def _find_screened_fixture_candidates(
+    source_fixture_id: str, search_term: str
+) -> Dict[str, Any]:
+    """Searches for fixtures by a keyword and returns the full details of every candidate that passes the Step 1 sport pre-screen. Disqualified candidates and the source fixture are already removed."""
+    search_results = _find_matching_fixtures(source_fixture_id, search_term)
+    hydrated = fetch_fixtures_by_ids(
+        [source_fixture_id, *(item["id"] for item in search_results)]
+    )
+    return screen_candidates(source_fixture_id, hydrated, "fixture")
+
+
+async def _afind_screened_fixture_candidates(
+    source_fixture_id: str, search_term: str
+) -> Dict[str, Any]:
+    search_results = await _afind_matching_fixtures(source_fixture_id, search_term)
+    hydrated = await afetch_fixtures_by_ids(
+        [source_fixture_id, *(item["id"] for item in search_results)]
+    )
+    return screen_candidates(source_fixture_id, hydrated, "fixture")
+
+
+find_screened_fixture_candidates = tool_with_coroutine(
+    _find_screened_fixture_candidates,
+    _afind_screened_fixture_candidates,
+    FindScreenedFixtureCandidatesInput,
+    lambda screened: serialize_screened_candidates(screened, "fixture"),
+)
+
 
 # --- Tool 8: The Google Search Tool ---
 # tavily_tool = TavilySearchResults(max_results=3)
@@ -251,8 +703,8 @@ def find_matching_fixtures(
 def get_agent_tools(entity_type: str) -> List[Any]:
     """Returns a list of tools based on the entity type."""
     if entity_type.lower() == "team":
-        return [get_team_by_id, find_matching_teams]
+        return [get_team_by_id, find_screened_team_candidates]
     elif entity_type.lower() == "fixture":
-        return [get_fixture_by_id, find_matching_fixtures]
+        return [get_fixture_by_id, find_screened_fixture_candidates]
     else:
         raise ValueError(f"Unsupported entity type: {entity_type}")
@@ -0,0 +1,450 @@
+import asyncio
+import csv
+import itertools
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional
+
+# Work Queue Settings
+WORK_QUEUE_LEASE_SECONDS = float(os.getenv("WORK_QUEUE_LEASE_SECONDS", "600"))
+WORK_QUEUE_MAX_ATTEMPTS = int(os.getenv("WORK_QUEUE_MAX_ATTEMPTS", "3"))
+WORK_QUEUE_POLL_SECONDS = float(os.getenv("WORK_QUEUE_POLL_SECONDS", "5"))
+WORK_QUEUE_RETRY_BASE_SECONDS = float(os.getenv("WORK_QUEUE_RETRY_BASE_SECONDS", "30"))
+WORK_QUEUE_RETRY_MAX_SECONDS = float(os.getenv("WORK_QUEUE_RETRY_MAX_SECONDS", "600"))
+
+STATUS_PENDING = "pending"
+STATUS_LEASED = "leased"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+ENQUEUE_CHUNK_SIZE = 1000
+
+
+def worker_name() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+# --- Durable SQLite Work Queue ---
+class WorkQueue:
+    """
+    Durable queue of source IDs in a SQLite WAL database. Workers lease items
+    for `lease_seconds` and renew the lease while the item runs; an item whose
+    lease expires (e.g. its worker crashed) is delivered again, up to
+    `max_attempts` times in total. A failed item waits `retry_base_seconds`,
+    doubling per attempt up to `retry_max_seconds`, before it is leased again.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        lease_seconds: float = WORK_QUEUE_LEASE_SECONDS,
+        max_attempts: int = WORK_QUEUE_MAX_ATTEMPTS,
+        retry_base_seconds: float = WORK_QUEUE_RETRY_BASE_SECONDS,
+        retry_max_seconds: float = WORK_QUEUE_RETRY_MAX_SECONDS,
+    ):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self._conn: Optional[sqlite3.Connection] = None
+        # Async workers call in from several threads over one connection
+        self._lock = threading.RLock()
+
+    def _db(self) -> sqlite3.Connection:
+        # Connections are opened lazily so each worker process gets its own
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(
+                self.path, timeout=30, isolation_level=None, check_same_thread=False
+            )
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS items (
+                    source_id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    lease_owner TEXT,
+                    leased_at REAL,
+                    lease_expires REAL,
+                    result TEXT,
+                    enqueued_at REAL NOT NULL,
+                    completed_at REAL,
+                    not_before REAL NOT NULL DEFAULT 0
+                );
+                CREATE INDEX IF NOT EXISTS items_status ON items (status, lease_expires);
+                CREATE TABLE IF NOT EXISTS workers (
+                    worker_id TEXT PRIMARY KEY,
+                    started_at REAL NOT NULL,
+                    last_seen REAL NOT NULL,
+                    completed INTEGER NOT NULL DEFAULT 0,
+                    errors INTEGER NOT NULL DEFAULT 0
+                );
+                """
+            )
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(items)")}
+            if "not_before" not in columns:
+                self._conn.execute(
+                    "ALTER TABLE items ADD COLUMN not_before REAL NOT NULL DEFAULT 0"
+                )
+        return self._conn
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    @contextmanager
+    def _transaction(self):
+        """
+        BEGIN IMMEDIATE takes the write lock up front, so concurrent workers
+        serialize their read-then-update steps and never lease the same item.
+        """
+        with self._lock:
+            conn = self._db()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def enqueue(self, source_ids: Iterable[str]) -> int:
+        """Adds IDs that are not queued yet, streaming them in chunks."""
+        conn = self._db()
+        added = 0
+        source_iter = iter(source_ids)
+        while chunk := list(itertools.islice(source_iter, ENQUEUE_CHUNK_SIZE)):
+            now = time.time()
+            before = conn.total_changes
+            with self._transaction():
+                conn.executemany(
+                    "INSERT OR IGNORE INTO items (source_id, status, enqueued_at) VALUES (?, ?, ?)",
+                    [
+                        (source_id, STATUS_PENDING, now)
+                        for source_id in chunk
+                        if source_id
+                    ],
+                )
+            added += conn.total_changes - before
+        return added
+
+    def register_worker(self, worker_id: str):
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO workers (worker_id, started_at, last_seen) VALUES (?, ?, ?)",
+                (worker_id, now, now),
+            )
+
+    def lease(self, worker_id: str) -> Optional[str]:
+        """
+        Leases the oldest pending (or lease-expired) item to `worker_id` and
+        returns its ID, or None if nothing is available right now. Failed
+        items are skipped until their retry backoff has passed.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            # Expired leases that used their last attempt are given up on
+            conn.execute(
+                "UPDATE items SET status = ?, completed_at = ?, lease_owner = NULL, "
+                "result = json_object('source_gsl_id', source_id, "
+                "'best_match_gsl_id', 'processing error', "
+                "'score', 'lease expired after ' || attempts || ' attempts', "
+                "'justification', '') "
+                "WHERE status = ? AND lease_expires < ? AND attempts >= ?",
+                (STATUS_FAILED, now, STATUS_LEASED, now, self.max_attempts),
+            )
+            row = conn.execute(
+                "SELECT source_id FROM items "
+                "WHERE (status = ? AND not_before <= ?) "
+                "OR (status = ? AND lease_expires < ?) "
+                "ORDER BY enqueued_at LIMIT 1",
+                (STATUS_PENDING, now, STATUS_LEASED, now),
+            ).fetchone()
+            if row:
+                conn.execute(
+                    "UPDATE items SET status = ?, attempts = attempts + 1, lease_owner = ?, "
+                    "leased_at = ?, lease_expires = ? WHERE source_id = ?",
+                    (STATUS_LEASED, worker_id, now, now + self.lease_seconds, row[0]),
+                )
+        return row[0] if row else None
+
+    def complete(self, worker_id: str, source_id: str, result: Dict[str, Any]) -> bool:
+        """
+        Commits a result for an item leased by `worker_id`. Processing errors
+        go back to pending, with an exponential retry backoff, until the item
+        runs out of attempts. Returns False
+        if the lease was lost to another worker, in which case nothing changes.
+        """
+        failed = result.get("best_match_gsl_id") == "processing error"
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE items SET status = CASE "
+                "WHEN ? = 0 THEN ? WHEN attempts < ? THEN ? ELSE ? END, "
+                "result = ?, completed_at = ?, lease_owner = NULL, lease_expires = NULL, "
+                "not_before = ? + MIN(? * (1 << (attempts - 1)), ?) "
+                "WHERE source_id = ? AND status = ? AND lease_owner = ?",
+                (
+                    int(failed),
+                    STATUS_DONE,
+                    self.max_attempts,
+                    STATUS_PENDING,
+                    STATUS_FAILED,
+                    json.dumps(result, default=str),
+                    now,
+                    now,
+                    self.retry_base_seconds if failed else 0,
+                    self.retry_max_seconds,
+                    source_id,
+                    STATUS_LEASED,
+                    worker_id,
+                ),
+            )
+            conn.execute(
+                "UPDATE workers SET last_seen = ?, completed = completed + 1, "
+                "errors = errors + ? WHERE worker_id = ?",
+                (now, int(failed), worker_id),
+            )
+        return cursor.rowcount == 1
+
+    def renew(self, worker_id: str, source_id: str) -> bool:
+        """
+        Extends a running item's lease by `lease_seconds`. Returns False if the
+        lease was already lost to another worker.
+        """
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE items SET lease_expires = ? "
+                "WHERE source_id = ? AND status = ? AND lease_owner = ?",
+                (time.time() + self.lease_seconds, source_id, STATUS_LEASED, worker_id),
+            )
+        return cursor.rowcount == 1
+
+    def has_open_work(self) -> bool:
+        """True while any item is pending or leased (leases may still expire)."""
+        with self._lock:
+            row = (
+                self._db()
+                .execute(
+                    "SELECT 1 FROM items WHERE status IN (?, ?) LIMIT 1",
+                    (STATUS_PENDING, STATUS_LEASED),
+                )
+                .fetchone()
+            )
+        return row is not None
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth by status, lease ages and per-worker throughput."""
+        conn = self._db()
+        now = time.time()
+        depth = dict(
+            conn.execute(
+                "SELECT status, COUNT(*) FROM items GROUP BY status"
+            ).fetchall()
+        )
+        oldest, average, expired = conn.execute(
+            "SELECT MAX(? - leased_at), AVG(? - leased_at), "
+            "SUM(CASE WHEN lease_expires < ? THEN 1 ELSE 0 END) FROM items WHERE status = ?",
+            (now, now, now, STATUS_LEASED),
+        ).fetchone()
+        workers = [
+            {
+                "worker_id": worker_id,
+                "completed": completed,
+                "errors": errors,
+                "throughput_per_min": round(
+                    completed / max(last_seen - started_at, 1e-9) * 60, 1
+                ),
+                "idle_s": round(now - last_seen, 1),
+            }
+            for worker_id, started_at, last_seen, completed, errors in conn.execute(
+                "SELECT worker_id, started_at, last_seen, completed, errors FROM workers "
+                "ORDER BY worker_id"
+            ).fetchall()
+        ]
+        return {
+            "depth": {
+                status: depth.get(status, 0)
+                for status in (
+                    STATUS_PENDING,
+                    STATUS_LEASED,
+                    STATUS_DONE,
+                    STATUS_FAILED,
+                )
+            },
+            "oldest_lease_age_s": round(oldest or 0.0, 1),
+            "average_lease_age_s": round(average or 0.0, 1),
+            "expired_leases": expired or 0,
+            "workers": workers,
+        }
+
+    def write_csv(self, output_file: str, fields: List[str]) -> int:
+        """Writes the results of every finished item to a CSV."""
+        rows = self._db().execute(
+            "SELECT result FROM items WHERE status IN (?, ?) AND result IS NOT NULL "
+            "ORDER BY completed_at",
+            (STATUS_DONE, STATUS_FAILED),
+        )
+        count = 0
+        with open(output_file, mode="w", newline="", encoding="utf-8") as outfile:
+            writer = csv.writer(outfile)
+            writer.writerow(fields)
+            for (payload,) in rows:
+                result = json.loads(payload)
+                writer.writerow([result.get(field, "") for field in fields])
+                count += 1
+        print(f"Exported {count} results to '{output_file}'.")
+        return count
+
+
+def format_queue_stats(stats: Dict[str, Any]) -> str:
+    depth = " ".join(f"{status}={count}" for status, count in stats["depth"].items())
+    lines = [
+        f"[queue] {depth} oldest_lease_age={stats['oldest_lease_age_s']}s "
+        f"average_lease_age={stats['average_lease_age_s']}s "
+        f"expired_leases={stats['expired_leases']}"
+    ]
+    lines.extend(
+        f"[worker] {worker['worker_id']} completed={worker['completed']} "
+        f"errors={worker['errors']} throughput={worker['throughput_per_min']}/min "
+        f"idle={worker['idle_s']}s"
+        for worker in stats["workers"]
+    )
+    return "\n".join(lines)
+
+
+# --- Queue Workers ---
+
+
+async def run_worker_async(
+    queue: WorkQueue,
+    agent_executor,
+    worker_id: str,
+    concurrency: int = 1,
+    poll_seconds: float = WORK_QUEUE_POLL_SECONDS,
+):
+    """
+    Runs up to `concurrency` leases at a time until the queue has no pending
+    or leased work left. While other workers hold leases that may still
+    expire, idle slots poll every `poll_seconds`.
+    """
+    from er_agent import BatchProgress, run_single_process
+
+    progress = BatchProgress()
+    await asyncio.to_thread(queue.register_worker, worker_id)
+
+    async def heartbeat(source_id: str):
+        # Renew well before expiry so a slow but live run keeps its lease
+        while True:
+            await asyncio.sleep(queue.lease_seconds / 3)
+            if not await asyncio.to_thread(queue.renew, worker_id, source_id):
+                return
+
+    async def slot():
+        while True:
+            source_id = await asyncio.to_thread(queue.lease, worker_id)
+            if source_id is None:
+                if not await asyncio.to_thread(queue.has_open_work):
+                    return
+                await asyncio.sleep(poll_seconds)
+                continue
+            progress.started += 1
+            renewal = asyncio.create_task(heartbeat(source_id))
+            try:
+                result = await run_single_process(agent_executor, source_id)
+            finally:
+                renewal.cancel()
+            progress.record(result)
+            if not await asyncio.to_thread(
+                queue.complete, worker_id, source_id, result
+            ):
+                print(f"[{worker_id}] Lease on {source_id} expired; result discarded.")
+            print(f"[{worker_id}] {progress.report()}")
+
+    await asyncio.gather(*(slot() for _ in range(max(concurrency, 1))))
+    print(f"[{worker_id}] Queue drained. {progress.report()}")
+
+
+def worker_process(
+    queue_path: str,
+    entity_type: str,
+    scoring_method: str,
+    concurrency: int,
+    fixture_index_path: Optional[str] = None,
+    prompt_cache: bool = False,
+    ambiguity_band: Optional[float] = None,
+):
+    """Entry point of one worker process: builds its own agent and drains the queue."""
+    from er_agent import build_agent
+    from http_client import aclose_clients
+    from model_routing import route_stats
+    from rate_limit import rate_limit_stats
+
+    agent = build_agent(
+        entity_type, scoring_method, fixture_index_path, prompt_cache, ambiguity_band
+    )
+    if agent is None:
+        return
+    queue = WorkQueue(queue_path)
+
+    async def run():
+        try:
+            await run_worker_async(queue, agent, worker_name(), concurrency)
+        finally:
+            await aclose_clients()
+
+    try:
+        asyncio.run(run())
+    finally:
+        queue.close()
+        print(f"[{worker_name()}] Prompt token usage: {agent.prompt_usage.stats()}")
+        print(f"[{worker_name()}] Model routing: {route_stats.stats()}")
+        print(f"[{worker_name()}] Rate limits: {rate_limit_stats()}")
+
+
+def run_worker_pool(
+    queue_path: str,
+    entity_type: str,
+    scoring_method: str,
+    workers: int = 1,
+    concurrency: int = 1,
+    fixture_index_path: Optional[str] = None,
+    prompt_cache: bool = False,
+    ambiguity_band: Optional[float] = None,
+):
+    """Starts `workers` worker processes and waits for all of them to exit."""
+    # Spawned processes never inherit open SQLite or HTTP connections
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(
+            target=worker_process,
+            args=(
+                queue_path,
+                entity_type,
+                scoring_method,
+                concurrency,
+                fixture_index_path,
+                prompt_cache,
+                ambiguity_band,
+            ),
+        )
+        for _ in range(max(workers, 1))
+    ]
+    for process in processes:
+        process.start()
+    print(f"Started {len(processes)} worker processes on queue '{queue_path}'.")
+    for process in processes:
+        process.join()
+    print(format_queue_stats(WorkQueue(queue_path).stats()))
@@ -0,0 +1,143 @@
+from typing import Any, List
+
+import pytest
+from botocore.exceptions import ClientError
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.tools import StructuredTool
+from pydantic import BaseModel
+
+from final_answer import submit_match
+from model_routing import (
+    ROUTE_ADJUDICATE,
+    ROUTE_ESCALATE,
+    ROUTE_FALLBACK,
+    ROUTE_SEARCH,
+    ModelRouter,
+    RouteStats,
+)
+
+
+class StubChatModel(BaseChatModel):
+    """Returns (or raises) its scripted replies in order."""
+
+    replies: List[Any]
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.calls += 1
+        reply = self.replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        return ChatResult(generations=[ChatGeneration(message=reply)])
+
+
+class ModelStarts(BaseCallbackHandler):
+    def __init__(self):
+        self.starts = 0
+
+    def on_chat_model_start(self, *args, **kwargs):
+        self.starts += 1
+
+
+class GetTeamByIdInput(BaseModel):
+    team_id: str
+
+
+class FindCandidatesInput(BaseModel):
+    source_team_id: str
+    search_term: str
+
+
+TOOLS = [
+    StructuredTool.from_function(
+        lambda team_id: {},
+        name="get_team_by_id",
+        description="Fetches a team.",
+        args_schema=GetTeamByIdInput,
+    ),
+    StructuredTool.from_function(
+        lambda source_team_id, search_term: [],
+        name="find_screened_team_candidates",
+        description="Searches for candidate teams.",
+        args_schema=FindCandidatesInput,
+    ),
+    submit_match,
+]
+
+
+def tool_call(name: str, **args) -> AIMessage:
+    return AIMessage(content="", tool_calls=[{"id": name, "name": name, "args": args}])
+
+
+FETCH = tool_call("get_team_by_id", team_id="1")
+SEARCH = tool_call(
+    "find_screened_team_candidates", source_team_id="1", search_term="Foo"
+)
+SUBMIT = tool_call("submit_match", best_match_id="no match found")
+SEARCHING = [SystemMessage(content="scoring prompt"), HumanMessage(content="1")]
+ADJUDICATING = [*SEARCHING, SEARCH]
+
+
+def route(messages, fast, large, fallback=None):
+    """Routes one turn and returns the reply and the route counts."""
+    models = {"fast": fast, "large": large}
+    if fallback:
+        models["fallback"] = fallback
+    stats = RouteStats()
+    router = ModelRouter(
+        models, TOOLS, "large", "fast", "fallback" if fallback else None, stats=stats
+    )
+    callbacks = ModelStarts()
+    # Called directly, callbacks only arrive through the explicit config
+    message = router.invoke(messages, config={"callbacks": [callbacks]})
+    model_calls = fast.calls + large.calls + (fallback.calls if fallback else 0)
+    assert callbacks.starts == model_calls, "model calls not traced under the run"
+    return message, stats.stats()["routes"]
+
+
+def test_searching_turn_goes_to_fast_model():
+    fast, large = StubChatModel(replies=[FETCH]), StubChatModel(replies=[])
+    message, routes = route(SEARCHING, fast, large)
+    assert message is FETCH
+    assert routes == {ROUTE_SEARCH: 1}
+
+
+def test_adjudicating_turn_goes_to_large_model():
+    fast, large = StubChatModel(replies=[]), StubChatModel(replies=[SUBMIT])
+    message, routes = route(ADJUDICATING, fast, large)
+    assert message is SUBMIT
+    assert fast.calls == 0
+    assert routes == {ROUTE_ADJUDICATE: 1}
+
+
+@pytest.mark.parametrize(
+    "early_reply", [AIMessage(content="no match"), SUBMIT], ids=["no_tool", "submit"]
+)
+def test_fast_model_answer_is_escalated(early_reply):
+    fast = StubChatModel(replies=[early_reply])
+    large = StubChatModel(replies=[FETCH])
+    message, routes = route(SEARCHING, fast, large)
+    assert message is FETCH
+    assert routes == {ROUTE_SEARCH: 1, ROUTE_ESCALATE: 1}
+
+
+def test_throttled_call_moves_to_fallback_model():
+    throttle = ClientError(
+        {"Error": {"Code": "ThrottlingException", "Message": "Rate exceeded"}},
+        "Converse",
+    )
+    fast, large = StubChatModel(replies=[]), StubChatModel(replies=[throttle])
+    fallback = StubChatModel(replies=[SUBMIT])
+    message, routes = route(ADJUDICATING, fast, large, fallback)
+    assert message is SUBMIT
+    assert routes == {ROUTE_ADJUDICATE: 1, ROUTE_FALLBACK: 1}
@@ -0,0 +1,89 @@
+from typing import List
+
+from langchain_aws import ChatBedrockConverse
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    SystemMessage,
+    ToolMessage,
+)
+from langchain_core.prompt_values import ChatPromptValue
+
+from prompt_cache import CACHE_POINT, PromptCacheUsage, add_cache_points
+
+
+class StubBedrockClient:
+    """Records Converse requests and answers with a fully cache-read response."""
+
+    def __init__(self):
+        self.requests = []
+
+    def converse(self, **request):
+        self.requests.append(request)
+        return {
+            "output": {"message": {"role": "assistant", "content": [{"text": "ok"}]}},
+            "stopReason": "end_turn",
+            "usage": {
+                "inputTokens": 10,
+                "outputTokens": 2,
+                "totalTokens": 3012,
+                "cacheReadInputTokens": 3000,
+                "cacheWriteInputTokens": 0,
+            },
+            "metrics": {"latencyMs": 1},
+        }
+
+
+def tool_round(call_id: str) -> List[BaseMessage]:
+    call = {"id": call_id, "name": "get_team_by_id", "args": {"team_id": "1"}}
+    return [
+        AIMessage(content="", tool_calls=[call]),
+        ToolMessage(content='{"id": "1"}', tool_call_id=call_id),
+    ]
+
+
+def converse_request(usage: PromptCacheUsage) -> dict:
+    client = StubBedrockClient()
+    model = ChatBedrockConverse(
+        model_id="stub-model", client=client, region_name="us-east-1", callbacks=[usage]
+    )
+    prompt = ChatPromptValue(
+        messages=[
+            SystemMessage(content="scoring prompt"),
+            HumanMessage(content="match team 1"),
+            *tool_round("source"),
+            *tool_round("candidates"),
+        ]
+    )
+    model.invoke(add_cache_points(prompt))
+    return client.requests[0]
+
+
+def tool_result_contents(request: dict) -> List[list]:
+    return [
+        message["content"]
+        for message in request["messages"]
+        if any("toolResult" in block for block in message["content"])
+    ]
+
+
+def test_checkpoint_after_system_prompt():
+    request = converse_request(PromptCacheUsage())
+    assert request["system"][-1] == CACHE_POINT
+
+
+def test_checkpoint_after_first_tool_results_only():
+    first_results, later_results = tool_result_contents(
+        converse_request(PromptCacheUsage())
+    )
+    assert first_results[-1] == CACHE_POINT
+    assert CACHE_POINT not in later_results
+
+
+def test_usage_counts_cache_reads():
+    usage = PromptCacheUsage()
+    converse_request(usage)
+    stats = usage.stats()
+    assert stats["calls"] == 1
+    assert stats["cache_read_tokens"] == 3000